@@ -53,10 +53,12 @@ def fetch_transcript(video_url: str) -> str | None:
         subtitle_data = None
         for lang_code in ['en-US', 'en']:
             json3_path = f'{temp_filename_base}.{lang_code}.json3'
-            if os.path.exists(json3_path):
+            try:
                 with open(json3_path, 'r', encoding='utf-8') as f:
                     subtitle_data = json.load(f)
-                break
+            except FileNotFoundError:
+                continue
+            break
         
         if not subtitle_data:
             logging.warning(f"No usable JSON3 English subtitle file found for {video_url}.")
@@ -71,8 +73,10 @@ def fetch_transcript(video_url: str) -> str | None:
         for lang_code in ['en-US', 'en']:
             for ext in ['.json3', '.vtt']:
                 filepath_to_clean = f'{temp_filename_base}.{lang_code}{ext}'
-                if os.path.exists(filepath_to_clean):
+                try:
                     os.remove(filepath_to_clean)
+                except FileNotFoundError:
+                    pass
 
 
 def build_corpus():
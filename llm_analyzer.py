@@ -1,12 +1,15 @@
 import os
 import openai
 import google.generativeai as genai
-import json
+import orjson
 import logging
 import re
-import time
+import tiktoken
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
+from google.api_core import exceptions as google_exceptions
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 
 # Import the RoBERTa function from your models file
 from models import run_go_emotions
@@ -16,6 +19,67 @@ load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY", "")
 genai.configure(api_key=os.getenv("GEMINI_API_KEY", "")) # type: ignore
 
+# --- Retry Configuration ---
+# Transient failures (rate limits, timeouts, 5xx) are retried with exponential
+# backoff + jitter, so the happy path no longer pays a fixed delay per call.
+MAX_API_ATTEMPTS = 5
+MAX_BACKOFF_SECONDS = 30
+
+OPENAI_RETRYABLE_ERRORS = (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+GEMINI_RETRYABLE_ERRORS = (google_exceptions.ResourceExhausted, google_exceptions.DeadlineExceeded,
+                           google_exceptions.ServiceUnavailable, google_exceptions.InternalServerError)
+
+def _log_retry(retry_state) -> None:
+    logging.warning(f"API call failed ({retry_state.outcome.exception()}); retry {retry_state.attempt_number}/{MAX_API_ATTEMPTS - 1}...")
+
+def _with_backoff(retryable_errors: tuple):
+    """Retry decorator for transient API errors (exponential backoff with jitter)."""
+    return retry(
+        retry=retry_if_exception_type(retryable_errors),
+        wait=wait_random_exponential(multiplier=1, max=MAX_BACKOFF_SECONDS),
+        stop=stop_after_attempt(MAX_API_ATTEMPTS),
+        before_sleep=_log_retry,
+        reraise=True,
+    )
+
+# --- Transcript Truncation ---
+# Oversized transcripts are cut to a head + tail window (in tokens) so a single
+# long video can't blow the context window or stall other calls on TPM budget.
+MAX_TRANSCRIPT_TOKENS = 50000
+TRUNCATION_HEAD_TOKENS = 37500
+TRUNCATION_MARKER = "\n...[truncated]...\n"
+# Rough characters per token. Transcripts within MAX_TRANSCRIPT_TOKENS * CHARS_PER_TOKEN
+# characters skip tokenization; it also sizes the character cut used without a tokenizer
+CHARS_PER_TOKEN = 4
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """gpt-4o tokenizer (a close enough proxy for Gemini), or None if it can't be loaded."""
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # The BPE file is downloaded on first use, which fails offline or behind a proxy
+        logging.warning(f"tiktoken encoding unavailable ({e}); truncating transcripts by characters")
+        return None
+
+def _truncate_transcript(transcript: str) -> str:
+    """Keeps the first and last tokens of an oversized transcript, dropping the middle."""
+    if len(transcript) <= MAX_TRANSCRIPT_TOKENS * CHARS_PER_TOKEN:
+        return transcript
+    enc = _get_encoding()
+    if enc is None:
+        head_chars = TRUNCATION_HEAD_TOKENS * CHARS_PER_TOKEN
+        tail_chars = (MAX_TRANSCRIPT_TOKENS - TRUNCATION_HEAD_TOKENS) * CHARS_PER_TOKEN - len(TRUNCATION_MARKER)
+        logging.info("Truncating transcript from %d to %d characters", len(transcript), MAX_TRANSCRIPT_TOKENS * CHARS_PER_TOKEN)
+        return transcript[:head_chars] + TRUNCATION_MARKER + transcript[-tail_chars:]
+    ids = enc.encode(transcript)
+    if len(ids) <= MAX_TRANSCRIPT_TOKENS:
+        return transcript
+    marker_ids = enc.encode(TRUNCATION_MARKER)
+    tail_tokens = MAX_TRANSCRIPT_TOKENS - TRUNCATION_HEAD_TOKENS - len(marker_ids)
+    logging.info("Truncating transcript from %d to %d tokens", len(ids), MAX_TRANSCRIPT_TOKENS)
+    return enc.decode(ids[:TRUNCATION_HEAD_TOKENS] + marker_ids + ids[-tail_tokens:])
+
 # --- Original Prompt V1 ---
 SYSTEM_PROMPT_V1 = """
 You are a media analyst AI tasked with scoring a news story transcript across 5 dimensions of peacefulness.
@@ -192,13 +256,29 @@ PROMPTS = {
     "v5_all_dimensions_context": SYSTEM_PROMPT_V5_ALL_DIMENSIONS_CONTEXT,
 }
 
+# --- Persistent clients ---
+# One client per process (and one GenerativeModel per model name), so every call reuses
+# the same pooled keep-alive HTTPS connections instead of setting up its own.
+# The SDKs' built-in retries are switched off: _with_backoff is the only retry layer
+@lru_cache(maxsize=1)
+def _get_openai_client() -> openai.OpenAI:
+    return openai.OpenAI(api_key=openai.api_key, max_retries=0)
+
+# Passed on every Gemini call; retry=None disables the google-api-core default retry
+_GEMINI_REQUEST_OPTIONS = {"retry": None}
+
+@lru_cache(maxsize=None)
+def _get_gemini_model(model_name: str):
+    return genai.GenerativeModel(model_name)  # type: ignore
+
 # --- Internal Helper for OpenAI ---
+@_with_backoff(OPENAI_RETRYABLE_ERRORS)
 def _analyze_with_openai(system_prompt: str, user_prompt: str, model_name: str = "gpt-4o") -> Dict[str, Any]:
     """Internal function to call the OpenAI API."""
     if not openai.api_key:
         raise ValueError("OPENAI_API_KEY not set.")
     
-    completion = openai.chat.completions.create(
+    completion = _get_openai_client().chat.completions.create(
         model=model_name,
         messages=[
             {"role": "system", "content": system_prompt},
@@ -209,9 +289,13 @@ def _analyze_with_openai(system_prompt: str, user_prompt: str, model_name: str =
     content = completion.choices[0].message.content
     if not content:
         raise ValueError("OpenAI API returned empty response.")
-    return json.loads(content)
+    return orjson.loads(content)
+
+# Outermost {...} span of a response that has text around its JSON
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
 
 # --- Internal Helper for Gemini ---
+@_with_backoff(GEMINI_RETRYABLE_ERRORS)
 def _analyze_with_gemini(full_prompt: str, model_name: str = "models/gemini-2.5-flash") -> Dict[str, Any]:
     """Internal function to call the Gemini API."""
     # Check if API key is configured (it's set via genai.configure() in module init)
@@ -219,7 +303,7 @@ def _analyze_with_gemini(full_prompt: str, model_name: str = "models/gemini-2.5-
     if not api_key:
         raise ValueError("GEMINI_API_KEY not set in environment variables.")
     
-    model = genai.GenerativeModel(model_name)  # type: ignore
+    model = _get_gemini_model(model_name)
     
     # Gemini uses a single prompt (combine system + user)
     # Add explicit JSON instruction
@@ -227,17 +311,17 @@ def _analyze_with_gemini(full_prompt: str, model_name: str = "models/gemini-2.5-
 
 IMPORTANT: Respond ONLY with valid JSON. Do not include any text before or after the JSON object."""
     
-    response = model.generate_content(json_prompt)
+    response = model.generate_content(json_prompt, request_options=_GEMINI_REQUEST_OPTIONS)
     
     # Extract JSON from response
     response_text = response.text.strip()
     
     # Try to find JSON in response (in case there's extra text)
-    json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+    json_match = _JSON_OBJECT_RE.search(response_text)
     if json_match:
         response_text = json_match.group(0)
     
-    return json.loads(response_text)
+    return orjson.loads(response_text)
 
 # --- Main Router Function (Updated to handle V3) ---
 def analyze_transcript_with_llm(transcript: str, model_provider: str, prompt_version: str, model_name: Optional[str] = None) -> Dict[str, Any]:
@@ -250,27 +334,27 @@ def analyze_transcript_with_llm(transcript: str, model_provider: str, prompt_ver
         prompt_version: One of the PROMPTS keys (e.g., "v5_all_dimensions")
         model_name: Optional model name override (e.g., "gpt-4o", "models/gemini-3-pro-preview")
     """
-    logging.info(f"Routing request for provider: {model_provider.upper()}, prompt: {prompt_version.upper()}, model: {model_name or 'default'}")
+    logging.debug("Routing request for provider: %s, prompt: %s, model: %s", model_provider, prompt_version, model_name or 'default')
     
     prompt_to_use = PROMPTS.get(prompt_version)
     if not prompt_to_use:
         raise ValueError(f"Unknown prompt_version. Available: {list(PROMPTS.keys())}")
 
     try:
-        # Rate limiting: add delay between API calls
-        time.sleep(1.5)  # 1.5 second delay to avoid rate limits
-        
+        # RoBERTa scores sentence-by-sentence, so only the LLM sees the truncated text
+        llm_transcript = _truncate_transcript(transcript)
+
         # Workflows that require RoBERTa pre-analysis
         if prompt_version in ['v1_context', 'v2_streamlined', 'v3_final', 'v5_all_dimensions_context']:
-            logging.info(f"{prompt_version.upper()} Workflow: Running RoBERTa pre-analysis...")
+            logging.debug("%s Workflow: Running RoBERTa pre-analysis...", prompt_version)
             roberta_result = run_go_emotions(transcript, "roberta_go_emotions")
             roberta_scores = roberta_result.get("average_scores", {})
-            roberta_scores_json = json.dumps({k: round(v, 4) for k, v in roberta_scores.items()}, indent=2)
+            roberta_scores_json = orjson.dumps({k: round(v, 4) for k, v in roberta_scores.items()}, option=orjson.OPT_INDENT_2).decode()
 
             user_prompt_with_context = f"""
 **Transcript to Analyze:**
 ```
-{transcript}
+{llm_transcript}
 ```
 
 **Emotional Profile Context:**
@@ -279,13 +363,13 @@ def analyze_transcript_with_llm(transcript: str, model_provider: str, prompt_ver
 ```
 """
             if model_provider == "openai":
-                logging.info(f"{prompt_version.upper()} Workflow: Sending combined prompt to OpenAI...")
+                logging.debug("%s Workflow: Sending combined prompt to OpenAI...", prompt_version)
                 openai_model = model_name if model_name else "gpt-4o"
                 return _analyze_with_openai(prompt_to_use, user_prompt_with_context, model_name=openai_model)
             elif model_provider == "gemini":
                 # Combine system and user prompts for Gemini
                 combined_prompt = f"{prompt_to_use}\n\n{user_prompt_with_context}"
-                logging.info(f"{prompt_version.upper()} Workflow: Sending combined prompt to Gemini...")
+                logging.debug("%s Workflow: Sending combined prompt to Gemini...", prompt_version)
                 gemini_model = model_name if model_name else "models/gemini-2.5-flash"
                 return _analyze_with_gemini(combined_prompt, model_name=gemini_model)
             else:
@@ -293,7 +377,7 @@ def analyze_transcript_with_llm(transcript: str, model_provider: str, prompt_ver
 
         # Workflows without RoBERTa context
         else:
-            user_prompt = f"**Transcript to Analyze:**\n```\n{transcript}\n```"
+            user_prompt = f"**Transcript to Analyze:**\n```\n{llm_transcript}\n```"
             
             if model_provider == "openai":
                 openai_model = model_name if model_name else "gpt-4o"
@@ -306,7 +390,7 @@ def analyze_transcript_with_llm(transcript: str, model_provider: str, prompt_ver
             else:
                 raise ValueError(f"Provider '{model_provider}' not configured. Use 'openai' or 'gemini'.")
         
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logging.error(f"Failed to decode JSON from {model_provider.upper()} response: {e}")
         raise ValueError("The model returned an invalid JSON response.")
     except Exception as e:
@@ -1,20 +1,36 @@
 import os
-from fastapi import FastAPI, HTTPException
+import asyncio
+import csv
+import hashlib
+import io
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any
-import pandas as pd
+from typing import Dict, Any, Optional
+from collections import OrderedDict
+import numpy as np
+import openpyxl
+import xlsxwriter
 from datetime import datetime
 import logging
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
-import openpyxl
 import mlflow
+from mlflow.entities import Metric, Param
+from mlflow.tracking import MlflowClient
 import models 
-from llm_analyzer import analyze_transcript_with_llm
+from llm_analyzer import PROMPTS, analyze_transcript_with_llm
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
-app = FastAPI()
+# orjson serializes the float-heavy response dicts much faster than stdlib json
+app = FastAPI(default_response_class=ORJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]
@@ -32,74 +48,315 @@ class FeedbackPayload(BaseModel):
     model_analysis: Dict[str, Any]
     user_feedback: Dict[str, Any]
 
+FEEDBACK_FIELDS = ["timestamp", "user_rating", "user_dominant_emotion", "user_comment", "model_analysis_json", "original_transcript"]
+
+# model_type ends up in a file name, so only known models get a feedback log
+FEEDBACK_MODEL_TYPES = frozenset(["roberta_go_emotions", "go_emotions"] + [f"llm_{version}" for version in PROMPTS])
+
+def _feedback_path(model_type: str) -> str:
+    if model_type not in FEEDBACK_MODEL_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown model_type '{model_type}'.")
+    return f"feedback_{model_type}.csv"
+
+def _append_feedback_rows(path: str, rows: list) -> None:
+    """
+    Appends CSV rows: O(rows) per call regardless of how much feedback is logged.
+    The rows go out in a single O_APPEND write and the header is written only by
+    whoever creates the file, so concurrent uvicorn workers can't interleave rows.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_EXCL)
+        writer.writerow(FEEDBACK_FIELDS)
+    except FileExistsError:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+    writer.writerows(rows)
+    try:
+        os.write(fd, buf.getvalue().encode('utf-8'))
+    finally:
+        os.close(fd)
+
+def _import_legacy_feedback(model_type: str) -> None:
+    """
+    One-time import of a feedback_<model_type>.xlsx log (the format before the CSV log).
+    The CSV is written to a temp file and linked into place only if no CSV exists yet,
+    so concurrent workers import it at most once. The .xlsx is left as it was.
+    """
+    xlsx_path = f"feedback_{model_type}.xlsx"
+    csv_path = _feedback_path(model_type)
+    if os.path.exists(csv_path) or not os.path.exists(xlsx_path):
+        return
+    workbook = openpyxl.load_workbook(xlsx_path, read_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        # Columns are matched by name; any missing from the old sheet are left empty
+        positions = [header.index(field) if field in header else None for field in FEEDBACK_FIELDS]
+        tmp_path = f"{csv_path}.import-{os.getpid()}"
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(FEEDBACK_FIELDS)
+            for row in rows:
+                writer.writerow(['' if pos is None or pos >= len(row) else row[pos] for pos in positions])
+    finally:
+        workbook.close()
+    try:
+        os.link(tmp_path, csv_path)
+        logging.info("Imported %s into %s", xlsx_path, csv_path)
+    except FileExistsError:
+        pass  # another worker (or a new row) created the CSV first
+    finally:
+        os.remove(tmp_path)
+
+@app.on_event("startup")
+async def import_legacy_feedback():
+    for model_type in FEEDBACK_MODEL_TYPES:
+        try:
+            await run_in_threadpool(_import_legacy_feedback, model_type)
+        except Exception as e:
+            logging.error(f"Failed to import legacy feedback for {model_type}: {e}", exc_info=True)
+
 @app.post("/feedback")
 async def receive_feedback(payload: FeedbackPayload):
-    feedback_file_path = f"feedback_{payload.model_type}.xlsx"
-    new_feedback_row = {
-        "timestamp": datetime.now().isoformat(),
-        "user_rating": payload.user_feedback.get('rating'),
-        "user_dominant_emotion": payload.user_feedback.get('user_emotion'),
-        "user_comment": payload.user_feedback.get('comment'),
-        "model_analysis_json": str(payload.model_analysis),
-        "original_transcript": payload.original_transcript
-    }
-    if os.path.exists(feedback_file_path):
-        df = pd.read_excel(feedback_file_path, engine='openpyxl')
-        new_row_df = pd.DataFrame([new_feedback_row])
-        df = pd.concat([df, new_row_df], ignore_index=True)
-    else:
-        df = pd.DataFrame([new_feedback_row])
-    df.to_excel(feedback_file_path, index=False, engine='xlsxwriter')
-    logging.info(f"Feedback successfully saved to {feedback_file_path}")
+    feedback_file_path = _feedback_path(payload.model_type)
+    new_feedback_row = [
+        datetime.now().isoformat(),
+        payload.user_feedback.get('rating'),
+        payload.user_feedback.get('user_emotion'),
+        payload.user_feedback.get('comment'),
+        str(payload.model_analysis),
+        payload.original_transcript
+    ]
+    # The row is on disk before the request is acknowledged; the append runs in the threadpool
+    await run_in_threadpool(_append_feedback_rows, feedback_file_path, [new_feedback_row])
+    logging.debug("Feedback successfully saved to %s", feedback_file_path)
     return {"status": "success", "message": "Feedback received!"}
 
-@app.post("/run_roberta_model")
-def run_roberta_model(request: TranscriptRequest):
+# Last export per feedback file with the CSV size it was built from. The log is
+# append-only, so an unchanged size means unchanged rows and no rebuild is needed.
+_feedback_export_cache: Dict[str, tuple] = {}
+
+_RATING_COL = FEEDBACK_FIELDS.index("user_rating")
+
+def _feedback_xlsx_bytes(feedback_file_path: str) -> bytes:
+    output = io.BytesIO()
+    # Rows are streamed straight from the CSV (no DataFrame). Transcripts/comments are
+    # free text, so skip URL detection. Only the rating column is written as numbers;
+    # comments and IDs stay strings even when they look numeric.
+    # (in_memory is left off since it would override constant_memory.)
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'strings_to_urls': False})
+    worksheet = workbook.add_worksheet()
+    with open(feedback_file_path, newline='', encoding='utf-8') as f:
+        for row_idx, row in enumerate(csv.reader(f)):
+            worksheet.write_row(row_idx, 0, row)
+            if len(row) > _RATING_COL:
+                try:
+                    rating = float(row[_RATING_COL])
+                except ValueError:
+                    continue  # header row or a missing rating: keep the string
+                if math.isfinite(rating):
+                    worksheet.write_number(row_idx, _RATING_COL, rating)
+    workbook.close()
+    return output.getvalue()
+
+@app.get("/feedback/export")
+async def export_feedback(model_type: str):
+    """Builds the feedback log as an .xlsx download on demand."""
+    feedback_file_path = _feedback_path(model_type)
     try:
-        result = models.run_go_emotions(request.transcript, "roberta_go_emotions")
-        average_scores = result.get("average_scores", {})
-        
-        percent_scores = {key: value * 100 for key, value in average_scores.items()}
+        size = os.path.getsize(feedback_file_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"No feedback logged for model_type '{model_type}'.")
+    cached = _feedback_export_cache.get(feedback_file_path)
+    if cached is None or cached[0] != size:
+        cached = (size, await run_in_threadpool(_feedback_xlsx_bytes, feedback_file_path))
+        _feedback_export_cache[feedback_file_path] = cached
+    return StreamingResponse(
+        io.BytesIO(cached[1]),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": f'attachment; filename="feedback_{model_type}.xlsx"'}
+    )
+
+# --- RoBERTa micro-batching ---
+# Concurrent /run_roberta_model requests are queued and classified together, so
+# one batched forward pass serves several transcripts.
+ROBERTA_MAX_BATCH = int(os.getenv("ROBERTA_MAX_BATCH", 8))
+ROBERTA_MAX_WAIT_MS = int(os.getenv("ROBERTA_MAX_WAIT_MS", 10))
+_roberta_queue: "queue.Queue[tuple[str, Future]]" = queue.Queue()
+
+def _next_roberta_request(timeout: Optional[float] = None) -> Optional[tuple]:
+    """
+    Next queued (transcript, future) whose caller is still waiting. Cancelled futures
+    (client disconnected) are dropped here; the rest are marked running, so a later
+    cancel can no longer race the result write.
+    """
+    while True:
+        item = _roberta_queue.get(timeout=timeout)
+        if item[1].set_running_or_notify_cancel():
+            return item
+
+def _roberta_batch_worker():
+    while True:
+        # Nothing may end this thread: every later request would wait on it forever
+        try:
+            batch = [_next_roberta_request()]
+            deadline = time.monotonic() + ROBERTA_MAX_WAIT_MS / 1000
+            while len(batch) < ROBERTA_MAX_BATCH:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(_next_roberta_request(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                results = models.analyse_transcripts([t for t, _ in batch], "roberta_go_emotions")
+            except Exception as e:
+                for _, fut in batch:
+                    _resolve(fut, exception=e)
+            else:
+                for (_, fut), result in zip(batch, results):
+                    _resolve(fut, result=result)
+        except Exception:
+            logging.exception("RoBERTa batcher error")
+
+def _resolve(fut: Future, result: Any = None, exception: Optional[BaseException] = None) -> None:
+    try:
+        if exception is not None:
+            fut.set_exception(exception)
+        else:
+            fut.set_result(result)
+    except InvalidStateError:
+        pass  # already resolved or cancelled; nobody is waiting on it
+
+@app.on_event("startup")
+async def warmup_roberta():
+    # Load weights and run one forward pass at boot, so no request pays the cold start
+    clf = await run_in_threadpool(models._get_classifier, "roberta_go_emotions")
+    await run_in_threadpool(clf, ["warmup."])
+
+@app.on_event("startup")
+def start_roberta_batcher():
+    threading.Thread(target=_roberta_batch_worker, name="roberta-batcher", daemon=True).start()
+
+def _submit_roberta(transcript: str) -> Future:
+    fut: Future = Future()
+    _roberta_queue.put((transcript, fut))
+    return fut
+
+# Emotion groupings for the /run_roberta_model response (tuple order is the display order)
+RESPECT_EMOTIONS = ('approval', 'caring', 'admiration')
+CONTEMPT_EMOTIONS = ('disapproval', 'disgust', 'annoyance')
+POSITIVE_EMOTIONS = ('amusement', 'excitement', 'joy', 'love', 'optimism', 'pride', 'relief', 'gratitude')
+NEGATIVE_EMOTIONS = ('anger', 'disappointment', 'embarrassment', 'fear', 'grief', 'nervousness', 'remorse', 'sadness')
+NEUTRAL_EMOTIONS = ('confusion', 'curiosity', 'desire', 'realization', 'surprise')
+
+EMOTION_GROUPS = {
+    'respect': RESPECT_EMOTIONS,
+    'contempt': CONTEMPT_EMOTIONS,
+    'positive': POSITIVE_EMOTIONS,
+    'negative': NEGATIVE_EMOTIONS,
+    'neutral_breakdown': NEUTRAL_EMOTIONS,
+}
+AGGREGATE_GROUPS = ('respect', 'contempt', 'positive', 'negative')
+
+# Scores are laid out in models.ALL_EMOTIONS order; each group is a fixed index array into that vector
+LABEL_INDEX = {emo: i for i, emo in enumerate(models.ALL_EMOTIONS)}
+GROUP_INDEX = {group: np.array([LABEL_INDEX[e] for e in emos], dtype=np.intp) for group, emos in EMOTION_GROUPS.items()}
+# Display labels, built once rather than capitalized per request
+GROUP_LABELS = {group: tuple(e.capitalize() for e in emos) for group, emos in EMOTION_GROUPS.items()}
+# Every group's indices back to back, so a single gather (and one tolist) serves all groups;
+# GROUP_SLICES locates each group in the gathered vector
+DETAIL_INDEX = np.concatenate([GROUP_INDEX[group] for group in EMOTION_GROUPS])
+_group_starts = np.cumsum([0] + [len(emos) for emos in EMOTION_GROUPS.values()]).tolist()
+GROUP_SLICES = {group: slice(a, b) for group, a, b in zip(EMOTION_GROUPS, _group_starts, _group_starts[1:])}
+GROUP_STARTS = np.array(_group_starts[:-1], dtype=np.intp)
+AGGREGATE_POSITIONS = tuple(list(EMOTION_GROUPS).index(group) for group in AGGREGATE_GROUPS)
+
+def emotion_details(detail_scores: list, group: str) -> list:
+    """Per-emotion breakdown for one group, in display order."""
+    return [{'label': label, 'score': score} for label, score in zip(GROUP_LABELS[group], detail_scores[GROUP_SLICES[group]])]
+
+def _build_roberta_response(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Builds the grouped /run_roberta_model response from a raw analysis result."""
+    average_scores = result.get("average_scores", {})
+    percent = np.fromiter((average_scores.get(e, 0.0) for e in models.ALL_EMOTIONS),
+                          dtype=np.float64, count=len(models.ALL_EMOTIONS))
+    percent *= 100.0
+
+    detail = percent[DETAIL_INDEX]
+    # One reduceat call sums every group
+    group_sums = np.add.reduceat(detail, GROUP_STARTS).tolist()
+    agg_scores = {group: group_sums[pos] for group, pos in zip(AGGREGATE_GROUPS, AGGREGATE_POSITIONS)}
+    detail_scores = detail.tolist()
+    grouped = {group: emotion_details(detail_scores, group) for group in EMOTION_GROUPS}
+    dominant = result.get('dominant_emotion')
     
-        neutral_score = percent_scores.get('neutral', 0)
-        respect_emotions = ['approval', 'caring', 'admiration']
-        contempt_emotions = ['disapproval', 'disgust', 'annoyance']
-        positive_emotions = ['amusement', 'excitement', 'joy', 'love', 'optimism', 'pride', 'relief', 'gratitude']
-        negative_emotions = ['anger', 'disappointment', 'embarrassment', 'fear', 'grief', 'nervousness', 'remorse', 'sadness']
-        neutral_emotions_list = ['confusion', 'curiosity', 'desire', 'realization', 'surprise']
-        
-        def agg(emolist):
-            return sum([percent_scores.get(e, 0) for e in emolist])
-        
-        agg_scores = {'respect': agg(respect_emotions), 'contempt': agg(contempt_emotions), 'positive': agg(positive_emotions), 'negative': agg(negative_emotions)}
-        
-        def emotion_scores(emolist):
-            return [{'label': e.capitalize(), 'score': percent_scores.get(e, 0)} for e in emolist]
-            
-        grouped = {'respect': emotion_scores(respect_emotions), 'contempt': emotion_scores(contempt_emotions), 'positive': emotion_scores(positive_emotions), 'negative': emotion_scores(negative_emotions), 'neutral_breakdown': emotion_scores(neutral_emotions_list)}
-        
-        return {
-            'dominant_emotion': result.get('dominant_emotion'),
-            'dominant_emotion_score': percent_scores.get(result.get('dominant_emotion'), 0),
-            'aggregate_scores': agg_scores,
-            'neutral_score': neutral_score,
-            'emotions': grouped
-        }
+    return {
+        'dominant_emotion': dominant,
+        'dominant_emotion_score': float(percent[LABEL_INDEX[dominant]]) if dominant in LABEL_INDEX else 0,
+        'aggregate_scores': agg_scores,
+        'neutral_score': float(percent[LABEL_INDEX['neutral']]),
+        'emotions': grouped
+    }
+
+# Response for a transcript with nothing to score, built once
+EMPTY_ROBERTA_RESPONSE = _build_roberta_response(models.EMPTY_ANALYSIS)
+
+# Built responses keyed by blake2b(transcript); inference is deterministic, so repeat
+# transcripts skip both the forward pass and the aggregation. Entries are shared and
+# only ever serialized, never mutated.
+ROBERTA_CACHE_SIZE = int(os.getenv("ROBERTA_CACHE_SIZE", 4096))
+_roberta_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+_roberta_cache_lock = threading.Lock()
+
+async def _roberta_response(transcript: str) -> Dict[str, Any]:
+    """Runs RoBERTa (or reuses a cached response) and returns the grouped response."""
+    if not transcript.strip():
+        # Nothing to score; answer without queueing for the model
+        return EMPTY_ROBERTA_RESPONSE
+    key = hashlib.blake2b(transcript.encode('utf-8'), digest_size=16).digest()
+    with _roberta_cache_lock:
+        response = _roberta_cache.get(key)
+        if response is not None:
+            _roberta_cache.move_to_end(key)
+            return response
+    # Awaiting the batcher's future holds neither the event loop nor a threadpool slot
+    result = await asyncio.wrap_future(_submit_roberta(transcript))
+    response = _build_roberta_response(result)
+    with _roberta_cache_lock:
+        _roberta_cache[key] = response
+        if len(_roberta_cache) > ROBERTA_CACHE_SIZE:
+            _roberta_cache.popitem(last=False)
+    return response
+
+@app.post("/run_roberta_model")
+async def run_roberta_model(request: TranscriptRequest):
+    try:
+        return await _roberta_response(request.transcript)
     except Exception as e:
         logging.error(f"Error in RoBERTa model endpoint: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+# Caps in-flight /analyze_with_llm calls per worker so bursts can't oversubscribe CPU or API quota
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+LLM_SEMAPHORE = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
 @app.post("/analyze_with_llm")
 async def analyze_with_llm_endpoint(request: TranscriptRequest):
     try:
         if not request.transcript:
             raise HTTPException(status_code=400, detail="Transcript cannot be empty.")
             
-        analysis_result = analyze_transcript_with_llm(
-            transcript=request.transcript,
-            model_provider=request.model_provider,
-            prompt_version=request.prompt_version
-        )
+        # The LLM call (and its RoBERTa pre-analysis) blocks, so run it in the threadpool
+        async with LLM_SEMAPHORE:
+            analysis_result = await run_in_threadpool(
+                analyze_transcript_with_llm,
+                transcript=request.transcript,
+                model_provider=request.model_provider,
+                prompt_version=request.prompt_version
+            )
         
         return analysis_result
     except ValueError as e:
@@ -114,26 +371,74 @@ class MLflowLogPayload(BaseModel):
     transcript: str
     analysis_output: Dict[str, Any]
 
-@app.post("/log_llm_run")
-async def log_llm_run_to_mlflow(payload: MLflowLogPayload):
+def _score_metrics(analysis_output: Dict[str, Any]) -> Dict[str, float]:
+    """Per-dimension score metrics from an LLM analysis, in one pass."""
+    return {f"score_{dimension}": float(values['score'])
+            for dimension, values in analysis_output.items()
+            if isinstance(values, dict) and 'score' in values}
+
+# Threads for MLflow artifact uploads
+_MLFLOW_UPLOAD_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mlflow-upload")
+
+def _live_run_experiment_id(client: MlflowClient) -> str:
+    """The experiment a fluent start_run would use: MLFLOW_EXPERIMENT_NAME/ID, else Default."""
+    name = os.getenv("MLFLOW_EXPERIMENT_NAME")
+    if name:
+        experiment = client.get_experiment_by_name(name)
+        if experiment is not None:
+            return experiment.experiment_id
+    return os.getenv("MLFLOW_EXPERIMENT_ID", "0")
+
+def _log_llm_run(payload: MLflowLogPayload, score_metrics: Dict[str, float]) -> None:
+    """
+    Logs one live run with a single log_batch call for all params and metrics.
+    The run is created and closed through MlflowClient with its explicit run_id, since
+    the fluent active-run stack isn't safe to drive from concurrent threadpool threads.
+    """
+    client = MlflowClient()
+    run_id = None
     try:
-        with mlflow.start_run(run_name=f"LiveRun_{payload.model_name}"):
-            mlflow.log_param("run_type", "live_extension")
-            mlflow.log_param("model_name", payload.model_name)
-            mlflow.log_param("prompt_version", payload.prompt_version)
-            mlflow.log_param("transcript_length", len(payload.transcript))
-            mlflow.log_text(payload.transcript, "transcript.txt")
-            mlflow.log_dict(payload.analysis_output, "analysis_output.json")
-            for dimension, values in payload.analysis_output.items():
-                if isinstance(values, dict) and 'score' in values:
-                    mlflow.log_metric(f"score_{dimension}", values['score'])
-        
-        return {"status": "success", "message": "Run logged to MLflow."}
+        run_id = client.create_run(_live_run_experiment_id(client), run_name=f"LiveRun_{payload.model_name}").info.run_id
+        timestamp = int(time.time() * 1000)
+        params = [
+            Param("run_type", "live_extension"),
+            Param("model_name", payload.model_name),
+            Param("prompt_version", payload.prompt_version),
+            Param("transcript_length", str(len(payload.transcript))),
+        ]
+        metrics = [Metric(key, value, timestamp, 0) for key, value in score_metrics.items()]
+        client.log_batch(run_id, metrics=metrics, params=params)
+        # Both artifacts upload at the same time; the run is closed only once both are in
+        uploads = [
+            _MLFLOW_UPLOAD_POOL.submit(client.log_text, run_id, payload.transcript, "transcript.txt"),
+            _MLFLOW_UPLOAD_POOL.submit(client.log_dict, run_id, payload.analysis_output, "analysis_output.json"),
+        ]
+        for upload in uploads:
+            upload.result()
+        client.set_terminated(run_id, "FINISHED")
     except Exception as e:
         logging.error(f"Failed to log run to MLflow: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail="Failed to log run to MLflow.")
+        if run_id is not None:
+            try:
+                client.set_terminated(run_id, "FAILED")
+            except Exception:
+                logging.error(f"Failed to mark MLflow run {run_id} as failed", exc_info=True)
+
+@app.post("/log_llm_run")
+async def log_llm_run_to_mlflow(payload: MLflowLogPayload, background_tasks: BackgroundTasks):
+    # Extracted up front so a malformed score is reported to the caller, not lost in the background task
+    try:
+        score_metrics = _score_metrics(payload.analysis_output)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid score in analysis_output: {e}")
+    # The MLflow round-trips run after the response is sent (in the threadpool)
+    background_tasks.add_task(_log_llm_run, payload, score_metrics)
+    return {"status": "success", "message": "Run queued for MLflow logging."}
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8080)
+    # Each worker is its own process with its own model copy; size the pool so
+    # workers x torch threads roughly matches the available cores
+    workers = int(os.getenv("UVICORN_WORKERS", max(1, (os.cpu_count() or 1) // models.TORCH_NUM_THREADS)))
+    uvicorn.run("main:app", host="0.0.0.0", port=8080, workers=workers)
 
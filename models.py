@@ -1,14 +1,30 @@
 # import nltk
 # nltk.data.path.append("C:/Users/HOME/nltk_data")  # Add your preferred path
 # nltk.download('punkt', download_dir='C:/Users/HOME/nltk_data')
-from collections import defaultdict
-from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
 # from nltk.tokenize.punkt import PunktSentenceTokenizer, PunktParameters
+import os
 import re
+import hashlib
+import logging
+import shutil
+import tempfile
+import threading
+import torch
+import numpy as np
 import pandas as pd
+import xlsxwriter
+from collections import OrderedDict
 from functools import lru_cache
 import io
 
+try:
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTOptimizer, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig, OptimizationConfig
+    HAS_ONNXRUNTIME = True
+except ImportError:
+    HAS_ONNXRUNTIME = False
+
 # ────────────────────────────────────────────────────────────────────────────────
 # CONSTANTS
 # ────────────────────────────────────────────────────────────────────────────────
@@ -27,120 +43,387 @@ ALL_EMOTIONS = sorted(
 # Emotions to exclude when determining the "most dominant" non-neutral emotion
 NON_DOMINANT_EMOTIONS = {'neutral'}
 
+# Result for a transcript with no sentences to score
+EMPTY_ANALYSIS = {
+    "average_scores": {},
+    "dominant_emotion": "neutral",
+    "dominant_emotion_score": 0,
+    "dominant_attitude_emotion": None,
+    "dominant_attitude_score": 0,
+}
+
+# Intra-op threads for CPU inference; using every core thrashes cache at batch=1
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", min(4, os.cpu_count() or 1)))
+# Sentences per forward pass when classifying a batch of sentences
+INFERENCE_BATCH_SIZE = int(os.getenv("INFERENCE_BATCH_SIZE", 32))
+# "torch" (eager PyTorch) or "onnx" (ONNX Runtime via optimum, fused kernels)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+# Set to "int8" for dynamic INT8 quantization of the encoder weights (CPU only)
+INFERENCE_QUANTIZE = os.getenv("INFERENCE_QUANTIZE", "")
+# Local directory for exported/quantized model artifacts
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", ".model_cache")
+# Replay captured CUDA graphs for the forward pass (GPU + torch backend only)
+USE_CUDA_GRAPHS = os.getenv("USE_CUDA_GRAPHS", "0") == "1"
+# Batch sizes that get a captured graph (per sequence-length bucket); a batch is padded up to the next one
+CUDA_GRAPH_BATCH_BUCKETS = (1, 4, 16, 32)
+MAX_SEQ_LEN = 512
+# Batches are padded only up to the smallest of these that fits their longest sentence
+SEQ_LEN_BUCKETS = (64, 128, 256, MAX_SEQ_LEN)
+# Per-sentence token limit for emotion classification (about 500 characters of English)
+SENTENCE_MAX_TOKENS = int(os.getenv("SENTENCE_MAX_TOKENS", 128))
+# analyse_transcript results kept in memory, keyed by blake2b(transcript)
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", 1024))
+# File name ORTOptimizer gives the graph-optimized export
+OPTIMIZED_ONNX_FILE = "model_optimized.onnx"
+
 # ────────────────────────────────────────────────────────────────────────────────
 # UTILITIES
 # ────────────────────────────────────────────────────────────────────────────────
-_SIMPLE_SPLIT = re.compile(r'(?<=[.!?])\s+').split
+# Sentence break = whitespace run after terminal punctuation (group 1 is the cut span)
+_SENTENCE_BREAK = re.compile(r'[.!?](\s+)')
+_NEWLINES_TO_SPACES = str.maketrans({"\n": " ", "\r": " "})
 def split_into_sentences(text: str) -> list[str]:
-    return [s.strip() for s in _SIMPLE_SPLIT(text.strip().replace("\n", " ")) if s.strip()]
+    # One translate pass, then slice between break spans found by a single forward scan
+    text = text.translate(_NEWLINES_TO_SPACES)
+    sentences, start = [], 0
+    for m in _SENTENCE_BREAK.finditer(text):
+        sent = text[start:m.start(1)].strip()
+        if sent:
+            sentences.append(sent)
+        start = m.end(1)
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+class _CudaGraphRunner:
+    """Replays a captured forward pass over preallocated (batch, seq_len) input buffers."""
+
+    def __init__(self, model, batch_size: int, seq_len: int, pad_token_id: int):
+        self.pad_token_id = pad_token_id
+        self.input_ids = torch.full((batch_size, seq_len), pad_token_id, dtype=torch.long, device="cuda")
+        self.attention_mask = torch.zeros((batch_size, seq_len), dtype=torch.long, device="cuda")
+
+        # Warm up on a side stream before capture, as CUDA graph capture requires
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(stream):
+            for _ in range(2):
+                model(input_ids=self.input_ids, attention_mask=self.attention_mask)
+        torch.cuda.current_stream().wait_stream(stream)
+
+        self.graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(self.graph):
+            self.logits = model(input_ids=self.input_ids, attention_mask=self.attention_mask).logits
+
+    def __call__(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        n, length = input_ids.shape
+        self.input_ids.fill_(self.pad_token_id)
+        self.attention_mask.zero_()
+        self.input_ids[:n, :length].copy_(input_ids)
+        self.attention_mask[:n, :length].copy_(attention_mask)
+        self.graph.replay()
+        return self.logits[:n].clone()
+
+class EmotionClassifier:
+    """Fast (Rust) tokenizer + sequence-classification model, called directly without pipeline dispatch."""
+
+    def __init__(self, tokenizer, model, use_cuda_graphs: bool = False):
+        self.tokenizer = tokenizer
+        self.model = model
+        config = model.config
+        self.labels = [config.id2label[i] for i in range(config.num_labels)]
+        # Same activation the text-classification pipeline would pick for this config
+        self.multi_label = config.problem_type == "multi_label_classification" or config.num_labels == 1
+        # Fixed-order label masks, so dominant-label selection is a single argmax
+        self.dominant_mask = np.array([l not in NON_DOMINANT_EMOTIONS for l in self.labels])
+        self.attitude_mask = np.array([l in RESPECT | CONTEMPT for l in self.labels])
+        self.use_cuda_graphs = use_cuda_graphs
+        self._graphs: dict[tuple[int, int], _CudaGraphRunner] = {}
+        # Captured graphs share static input/output buffers, so capture and replay (through the
+        # copy-out) run one at a time; the batcher thread and request threadpool both call in
+        self._graphs_lock = threading.Lock()
+
+    def _forward(self, inputs) -> torch.Tensor:
+        n, seq_len = inputs["input_ids"].shape
+        bucket = next((b for b in CUDA_GRAPH_BATCH_BUCKETS if b >= n), None)
+        if not self.use_cuda_graphs or bucket is None:
+            return self.model(**inputs).logits
+        key = (bucket, seq_len)
+        with self._graphs_lock:
+            if key not in self._graphs:
+                self._graphs[key] = _CudaGraphRunner(self.model, bucket, seq_len, self.tokenizer.pad_token_id)
+            return self._graphs[key](inputs["input_ids"], inputs["attention_mask"])
 
-@lru_cache  # keeps it in memory across calls
-def _get_classifier(model_type: str):
+    def __call__(self, texts: list[str], batch_size: int = INFERENCE_BATCH_SIZE, max_length: int = MAX_SEQ_LEN) -> torch.Tensor:
+        """Returns a (len(texts), num_labels) tensor of per-label probabilities; texts are truncated to max_length tokens."""
+        probs = torch.empty((len(texts), len(self.labels)))
+        if not texts:
+            return probs
+        # Tokenize once unpadded, then batch sentences of similar length together so
+        # each batch is padded only to its length bucket rather than to MAX_SEQ_LEN
+        input_ids = self.tokenizer(texts, truncation=True, max_length=max_length)["input_ids"]
+        order = sorted(range(len(texts)), key=lambda i: len(input_ids[i]))
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                idx = order[start:start + batch_size]
+                seq_len = next(b for b in SEQ_LEN_BUCKETS if b >= len(input_ids[idx[-1]]))
+                inputs = self.tokenizer.pad({"input_ids": [input_ids[i] for i in idx]}, padding="max_length",
+                                            max_length=seq_len, return_tensors="pt").to(self.model.device)
+                logits = self._forward(inputs).float()
+                batch_probs = torch.sigmoid(logits) if self.multi_label else torch.softmax(logits, dim=-1)
+                probs[torch.tensor(idx)] = batch_probs.cpu()
+        return probs
+
+@lru_cache(maxsize=2)  # keeps it in memory across calls (one entry per model type)
+def _get_classifier(model_type: str) -> EmotionClassifier:
     if model_type == "roberta_go_emotions":
         model_name = "SamLowe/roberta-base-go_emotions"
     elif model_type == "go_emotions":
         model_name = "monologg/bert-base-cased-goemotions-original"
     else:
         raise ValueError("model_type must be 'go_emotions' or 'roberta_go_emotions'")
-    clf = pipeline("text-classification", model=model_name, top_k=None)
-    return clf
+    torch.set_num_threads(TORCH_NUM_THREADS)
+    tokenizer = AutoTokenizer.from_pretrained(_local_model_source(model_name), use_fast=True)
+    if INFERENCE_BACKEND == "onnx":
+        if HAS_ONNXRUNTIME:
+            return EmotionClassifier(tokenizer, _get_onnx_model(model_name))
+        logging.warning("optimum[onnxruntime] not installed. Falling back to the PyTorch backend.")
+    model = AutoModelForSequenceClassification.from_pretrained(_local_model_source(model_name))
+    if torch.cuda.is_available():
+        # fp16 on CUDA tensor cores; CPU keeps the default fp32
+        model = model.half().to("cuda")
+    elif INFERENCE_QUANTIZE == "int8":
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    model.eval()
+    return EmotionClassifier(tokenizer, model, use_cuda_graphs=USE_CUDA_GRAPHS and torch.cuda.is_available())
+
+def _local_model_dir(model_name: str, suffix: str = "") -> str:
+    return os.path.join(MODEL_CACHE_DIR, model_name.replace("/", "__") + suffix)
+
+def _save_atomically(target_dir: str, marker_file: str, save) -> None:
+    """
+    Runs save(tmp_dir) into a temp dir beside target_dir, then renames it into place, so a
+    worker warming up concurrently never loads a half-written artifact. If another worker
+    finished first, its complete copy (the one holding marker_file) is kept.
+    """
+    parent = os.path.dirname(target_dir) or "."
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=os.path.basename(target_dir) + ".tmp-")
+    try:
+        save(tmp_dir)
+        try:
+            os.replace(tmp_dir, target_dir)
+        except OSError:
+            if os.path.exists(os.path.join(target_dir, marker_file)):
+                return
+            # Leftover partial directory from an interrupted non-atomic write
+            shutil.rmtree(target_dir, ignore_errors=True)
+            os.replace(tmp_dir, target_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def _local_model_source(model_name: str) -> str:
+    """
+    Returns the local snapshot of a hub model, creating it on first use, so
+    restarts load straight from disk without hub resolution or re-downloads.
+    """
+    local_dir = _local_model_dir(model_name)
+    if not os.path.exists(os.path.join(local_dir, "config.json")):
+        def save(tmp_dir: str) -> None:
+            AutoTokenizer.from_pretrained(model_name, use_fast=True).save_pretrained(tmp_dir)
+            AutoModelForSequenceClassification.from_pretrained(model_name).save_pretrained(tmp_dir)
+        _save_atomically(local_dir, "config.json", save)
+    return local_dir
+
+def _get_onnx_model(model_name: str):
+    provider = "CUDAExecutionProvider" if torch.cuda.is_available() else "CPUExecutionProvider"
+    if INFERENCE_QUANTIZE == "int8" and provider == "CPUExecutionProvider":
+        return _get_quantized_onnx_model(model_name)
+    return ORTModelForSequenceClassification.from_pretrained(_optimized_onnx_dir(model_name), file_name=OPTIMIZED_ONNX_FILE,
+                                                             provider=provider)
+
+def _exported_onnx_dir(model_name: str) -> str:
+    """Exports the model to ONNX once, reusing the saved export afterwards."""
+    onnx_dir = _local_model_dir(model_name, "-onnx")
+    if not os.path.exists(os.path.join(onnx_dir, "model.onnx")):
+        source = _local_model_source(model_name)
+        _save_atomically(onnx_dir, "model.onnx",
+                         lambda tmp_dir: ORTModelForSequenceClassification.from_pretrained(source, export=True).save_pretrained(tmp_dir))
+    return onnx_dir
+
+def _optimized_onnx_dir(model_name: str) -> str:
+    """Applies ONNX Runtime graph fusions (attention, GELU, LayerNorm) to the export once, reusing the saved file afterwards."""
+    save_dir = _local_model_dir(model_name, "-onnx-opt")
+    if not os.path.exists(os.path.join(save_dir, OPTIMIZED_ONNX_FILE)):
+        config = OptimizationConfig(optimization_level=2, optimize_for_gpu=torch.cuda.is_available())
+        optimizer = ORTOptimizer.from_pretrained(_exported_onnx_dir(model_name))
+        _save_atomically(save_dir, OPTIMIZED_ONNX_FILE,
+                         lambda tmp_dir: optimizer.optimize(save_dir=tmp_dir, optimization_config=config))
+    return save_dir
+
+def _get_quantized_onnx_model(model_name: str):
+    """Dynamically INT8-quantizes the optimized ONNX graph once, reusing the saved file afterwards."""
+    save_dir = _local_model_dir(model_name, "-onnx-int8")
+    quantized_file = "model_optimized_quantized.onnx"
+    if not os.path.exists(os.path.join(save_dir, quantized_file)):
+        qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        quantizer = ORTQuantizer.from_pretrained(_optimized_onnx_dir(model_name), file_name=OPTIMIZED_ONNX_FILE)
+        _save_atomically(save_dir, quantized_file,
+                         lambda tmp_dir: quantizer.quantize(save_dir=tmp_dir, quantization_config=qconfig))
+    return ORTModelForSequenceClassification.from_pretrained(save_dir, file_name=quantized_file)
 
 # ────────────────────────────────────────────────────────────────────────────────
 # CORE LOGIC
 # ────────────────────────────────────────────────────────────────────────────────
-def analyse_transcript(transcript: str, model_type: str) -> dict:
+def _summarise(clf: EmotionClassifier, scores: np.ndarray, dominant_idx: int, attitude_idx: int | None) -> dict:
+    """Builds a transcript's result from its average label-score vector and precomputed argmaxes."""
+    return {
+        "average_scores": dict(zip(clf.labels, scores.tolist())),
+        "dominant_emotion": clf.labels[dominant_idx],
+        "dominant_emotion_score": float(scores[dominant_idx]),
+        "dominant_attitude_emotion": clf.labels[attitude_idx] if attitude_idx is not None else None,
+        "dominant_attitude_score": float(scores[attitude_idx]) if attitude_idx is not None else 0
+    }
+
+def analyse_transcripts(transcripts: list[str], model_type: str) -> list[dict]:
+    """Scores several transcripts with one batched classifier call over all their sentences."""
     clf = _get_classifier(model_type)
-    scores, counts = defaultdict(float), defaultdict(int)
+    sentences = [split_into_sentences(t) for t in transcripts]
+    probs = clf([sent for sents in sentences for sent in sents], max_length=SENTENCE_MAX_TOKENS).numpy()
 
-    for sent in split_into_sentences(transcript):
-        for emo in clf(sent[:500])[0]:
-            scores[emo["label"]] += emo["score"]
-            counts[emo["label"]] += 1
+    counts = np.array([len(sents) for sents in sentences], dtype=np.intp)
+    scored = counts > 0
+    # Every label is scored for every sentence, so each transcript's average is the column mean of
+    # its contiguous block of rows; reduceat sums all the blocks at once (empty transcripts are skipped)
+    means = np.zeros((len(transcripts), len(clf.labels)), dtype=probs.dtype)
+    if scored.any():
+        starts = np.cumsum(counts) - counts
+        means[scored] = np.add.reduceat(probs, starts[scored], axis=0) / counts[scored, None]
+    # Dominant emotion excludes neutral and other non-expressive emotions
+    dominant = np.where(clf.dominant_mask, means, -np.inf).argmax(axis=1).tolist()
+    # Dominant attitude (respect vs contempt)
+    attitude = np.where(clf.attitude_mask, means, -np.inf).argmax(axis=1).tolist() if clf.attitude_mask.any() else None
 
-    avg = {l: scores[l] / counts[l] for l in scores if counts[l] > 0}
+    return [
+        _summarise(clf, means[i], dominant[i], attitude[i] if attitude is not None else None) if scored[i]
+        # Own average_scores dict per result, so no caller shares EMPTY_ANALYSIS's nested one
+        else {**EMPTY_ANALYSIS, "average_scores": {}}
+        for i in range(len(transcripts))
+    ]
 
-    # Calculate dominant emotion by excluding neutral and other non-expressive emotions
-    emotional_scores = {k: v for k, v in avg.items() if k not in NON_DOMINANT_EMOTIONS}
-    dominant = max(emotional_scores, key=emotional_scores.get) if emotional_scores else "neutral"
+_analysis_cache: "OrderedDict[tuple[str, bytes], dict]" = OrderedDict()
+_analysis_cache_lock = threading.Lock()
 
-    # Calculate dominant attitude (respect vs contempt)
-    attitude_scores = {k: v for k, v in avg.items() if k in RESPECT | CONTEMPT}
-    dom_att = max(attitude_scores, key=attitude_scores.get) if attitude_scores else None
-    return {
-        "average_scores": avg,
-        "dominant_emotion": dominant,
-        "dominant_emotion_score": avg.get(dominant, 0),
-        "dominant_attitude_emotion": dom_att,
-        "dominant_attitude_score": attitude_scores.get(dom_att, 0)
-    }
+def analyse_transcripts_cached(transcripts: list[str], model_type: str) -> list[dict]:
+    """Cached analyse_transcripts: only the cache misses are scored, together in one batched call."""
+    # Inference is deterministic, so repeat (model_type, transcript) pairs are served from memory
+    keys = [(model_type, hashlib.blake2b(t.encode('utf-8'), digest_size=16).digest()) for t in transcripts]
+    results = []
+    with _analysis_cache_lock:
+        for key in keys:
+            result = _analysis_cache.get(key)
+            if result is not None:
+                _analysis_cache.move_to_end(key)
+            results.append(result)
+    # First index of each distinct missing transcript, so duplicates in the batch are scored once
+    missing: dict[tuple[str, bytes], int] = {}
+    for i, (key, result) in enumerate(zip(keys, results)):
+        if result is None:
+            missing.setdefault(key, i)
+    if missing:
+        fresh = dict(zip(missing, analyse_transcripts([transcripts[i] for i in missing.values()], model_type)))
+        with _analysis_cache_lock:
+            for key, result in fresh.items():
+                _analysis_cache[key] = result
+                if len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+                    _analysis_cache.popitem(last=False)
+        results = [result if result is not None else fresh[key] for key, result in zip(keys, results)]
+    # Callers get their own copy, so mutating it can't corrupt the cached entry
+    return [{**result, "average_scores": dict(result["average_scores"])} for result in results]
+
+def analyse_transcript(transcript: str, model_type: str) -> dict:
+    return analyse_transcripts_cached([transcript], model_type)[0]
+
+# Fixed column order of the to_dataframe row
+_DOMINANT_COLS = ("dominant_emotion", "dominant_emotion_score", "dominant_attitude_emotion", "dominant_attitude_score")
+_COLS = tuple(ALL_EMOTIONS) + _DOMINANT_COLS
 
 def to_dataframe(emotion_result: dict) -> pd.DataFrame:
     """One-row DataFrame with 28 emotion columns."""
-    row = {emo: emotion_result["average_scores"].get(emo, 0) for emo in ALL_EMOTIONS}
-    row.update({
-        "dominant_emotion": emotion_result["dominant_emotion"],
-        "dominant_emotion_score": emotion_result["dominant_emotion_score"],
-        "dominant_attitude_emotion": emotion_result["dominant_attitude_emotion"],
-        "dominant_attitude_score": emotion_result["dominant_attitude_score"],
-    })
-    return pd.DataFrame([row])
+    scores = emotion_result["average_scores"]
+    values = tuple(scores.get(emo, 0) for emo in ALL_EMOTIONS) + tuple(emotion_result[col] for col in _DOMINANT_COLS)
+    return pd.DataFrame.from_records([values], columns=_COLS)
+
+# Header cell style pandas' to_excel used, kept so exports look the same
+_HEADER_FORMAT = {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}
+
+# constant_memory flushes each row to disk once the next one starts, so memory stays
+# O(row); rows must be written in order, after the column formats are set
+_WORKBOOK_OPTIONS = {'constant_memory': True, 'strings_to_urls': False}
+
+def _write_emotions_rows(wb: xlsxwriter.Workbook, ws, df: pd.DataFrame) -> None:
+    """Streams df into ws row by row, header first."""
+    ws.write_row(0, 0, df.columns.tolist(), wb.add_format(_HEADER_FORMAT))
+    # NaN -> None so missing values are left blank, as to_excel did
+    for row_idx, row in enumerate(df.astype(object).where(df.notna(), None).itertuples(index=False), start=1):
+        ws.write_row(row_idx, 0, row)
 
 def save_styled_excel(df: pd.DataFrame, save_path: str):
-    import os, xlsxwriter
     os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    with pd.ExcelWriter(save_path, engine="xlsxwriter") as writer:
-        df.to_excel(writer, index=False, sheet_name="Emotions")
-        wb, ws = writer.book, writer.sheets["Emotions"]
-
-        yellow = wb.add_format({'bold': True, 'bg_color': '#FFFACD'})
-        red    = wb.add_format({'bold': True, 'bg_color': '#FFD4D4'})
-
-        for idx, col in enumerate(df.columns, 0):  # 0-based here
-            if col in RESPECT:
-                ws.set_column(idx, idx, 14, yellow)
-            elif col in CONTEMPT:
-                ws.set_column(idx, idx, 14, red)
-            else:
-                ws.set_column(idx, idx, 14)
+    wb = xlsxwriter.Workbook(save_path, _WORKBOOK_OPTIONS)
+    ws = wb.add_worksheet("Emotions")
 
-def create_styled_excel_bytes(df: pd.DataFrame) -> io.BytesIO:
-    """Creates a styled Excel file in memory and returns it as a BytesIO object."""
-    import io, xlsxwriter
+    yellow = wb.add_format({'bold': True, 'bg_color': '#FFFACD'})
+    red    = wb.add_format({'bold': True, 'bg_color': '#FFD4D4'})
+
+    for idx, col in enumerate(df.columns, 0):  # 0-based here
+        if col in RESPECT:
+            ws.set_column(idx, idx, 14, yellow)
+        elif col in CONTEMPT:
+            ws.set_column(idx, idx, 14, red)
+        else:
+            ws.set_column(idx, idx, 14)
+    _write_emotions_rows(wb, ws, df)
+    wb.close()
 
+def create_styled_excel_bytes(df: pd.DataFrame) -> io.BytesIO:
+    """Creates a styled Excel file and returns it as a BytesIO object."""
     output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        df.to_excel(writer, index=False, sheet_name="Emotions")
-        wb, ws = writer.book, writer.sheets["Emotions"]
-
-        yellow = wb.add_format({'bold': True, 'bg_color': '#FFFACD'})
-        red    = wb.add_format({'bold': True, 'bg_color': '#FFD4D4'})
-        bold_format = wb.add_format({'bold': True})
-
-        header_map = {col: idx for idx, col in enumerate(df.columns)}
-
-        for emo in ALL_EMOTIONS:
-            col_name = emo
-            if col_name in header_map:
-                col_idx = header_map[col_name]
-                if emo in RESPECT:
-                    ws.set_column(col_idx, col_idx, 14, yellow)
-                elif emo in CONTEMPT:
-                    ws.set_column(col_idx, col_idx, 14, red)
-                else:
-                    ws.set_column(col_idx, col_idx, 14)
-        
-        dominant_cols = ["dominant_emotion", "dominant_emotion_score", "dominant_attitude_emotion", "dominant_attitude_score"]
-        for col in dominant_cols:
-            if col in header_map:
-                col_idx = header_map[col]
-                ws.set_column(col_idx, col_idx, 18, bold_format) 
-
-                if col in ["dominant_emotion", "dominant_attitude_emotion"]:
-                    cf_yellow = wb.add_format({'bg_color': '#FFFACD'})
-                    cf_red = wb.add_format({'bg_color': '#FFD4D4'})
-                    ws.conditional_format(1, col_idx, len(df), col_idx, {'type': 'text', 'criteria': 'containing', 'value': ', '.join(list(RESPECT)), 'format': cf_yellow})
-                    ws.conditional_format(1, col_idx, len(df), col_idx, {'type': 'text', 'criteria': 'containing', 'value': ', '.join(list(CONTEMPT)), 'format': cf_red})
+    # No in_memory here: it would override constant_memory
+    wb = xlsxwriter.Workbook(output, _WORKBOOK_OPTIONS)
+    ws = wb.add_worksheet("Emotions")
+
+    yellow = wb.add_format({'bold': True, 'bg_color': '#FFFACD'})
+    red    = wb.add_format({'bold': True, 'bg_color': '#FFD4D4'})
+    bold_format = wb.add_format({'bold': True})
+    cf_yellow = wb.add_format({'bg_color': '#FFFACD'})
+    cf_red = wb.add_format({'bg_color': '#FFD4D4'})
 
+    header_map = {col: idx for idx, col in enumerate(df.columns)}
+
+    for emo in ALL_EMOTIONS:
+        if emo in header_map:
+            col_idx = header_map[emo]
+            if emo in RESPECT:
+                ws.set_column(col_idx, col_idx, 14, yellow)
+            elif emo in CONTEMPT:
+                ws.set_column(col_idx, col_idx, 14, red)
+            else:
+                ws.set_column(col_idx, col_idx, 14)
+    
+    dominant_cols = ["dominant_emotion", "dominant_emotion_score", "dominant_attitude_emotion", "dominant_attitude_score"]
+    for col in dominant_cols:
+        if col in header_map:
+            col_idx = header_map[col]
+            ws.set_column(col_idx, col_idx, 18, bold_format) 
+
+            if col in ["dominant_emotion", "dominant_attitude_emotion"]:
+                ws.conditional_format(1, col_idx, len(df), col_idx, {'type': 'text', 'criteria': 'containing', 'value': ', '.join(list(RESPECT)), 'format': cf_yellow})
+                ws.conditional_format(1, col_idx, len(df), col_idx, {'type': 'text', 'criteria': 'containing', 'value': ', '.join(list(CONTEMPT)), 'format': cf_red})
+
+    _write_emotions_rows(wb, ws, df)
+    wb.close()
     output.seek(0)
     return output
 
@@ -153,6 +436,10 @@ def run_go_emotions(transcript: str, model_type: str,
         save_styled_excel(to_dataframe(res), f"results/{file_name}")
     return res
 
+def run_go_emotions_batch(transcripts: list[str], model_type: str) -> list[dict]:
+    """run_go_emotions for several transcripts, with all their sentences classified in one batched call."""
+    return analyse_transcripts_cached(transcripts, model_type)
+
 
 if __name__ == "__main__":
     run_go_emotions() # type: ignore
@@ -1,47 +1,156 @@
 """
 Parse Transcripts.docx and extract transcripts matched to video titles.
 """
+import io
 import os
 import re
 import logging
-from typing import Dict, Optional
+import pickle
+import zipfile
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Dict, Iterator, Optional
 
 try:
-    from docx import Document
-    HAS_DOCX = True
+    # lxml ships with python-docx; the document XML is streamed with it directly
+    from lxml import etree
+    HAS_LXML = True
 except ImportError:
-    HAS_DOCX = False
-    logging.warning("python-docx not installed. Cannot parse .docx files.")
+    HAS_LXML = False
+    logging.warning("lxml (python-docx) not installed. Cannot parse .docx files.")
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 TRANSCRIPTS_DOCX_PATH = "transcripts/Transcripts.docx"
+# Parsed result is reused across runs while the .docx's (mtime, size) is unchanged
+DOCX_CACHE_PATH = ".cache/transcripts_docx.pkl"
+# Part of the cache key; bump it when paragraph text rendering changes, so caches written
+# by an older parser are rebuilt instead of served
+DOCX_CACHE_VERSION = 2
 
+# Patterns are compiled once here rather than looked up in re's cache on every call
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+# URL forms in priority order: a text with several URLs yields the ID of the first form
+# that matches anywhere, not of the leftmost URL
+_YOUTUBE_URL_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})',
+    r'youtu\.be/([a-zA-Z0-9_-]{11})',
+    r'youtube\.com/embed/([a-zA-Z0-9_-]{11})',
+    r'youtube\.com/v/([a-zA-Z0-9_-]{11})',
+))
+_STANDALONE_ID_RE = re.compile(r'\b([a-zA-Z0-9_-]{11})\b')
+
+@lru_cache(maxsize=4096)
 def normalize_title(title: str) -> str:
     """Normalize title for matching (lowercase, remove special chars)."""
-    normalized = re.sub(r'[^\w\s]', '', title.lower())
-    normalized = re.sub(r'\s+', '_', normalized.strip())
-    return normalized[:50]  # Take first 50 chars
+    normalized = _NON_WORD_RE.sub('', title.lower())
+    # split() also strips, so whitespace runs collapse to '_' without a second regex pass
+    return '_'.join(normalized.split())[:50]  # Take first 50 chars
 
 def extract_youtube_id_from_text(text: str) -> Optional[str]:
     """Extract YouTube ID from text (could be in URL or standalone)."""
-    import re
     # Try URL patterns
-    url_patterns = [
-        r'youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})',
-        r'youtu\.be/([a-zA-Z0-9_-]{11})',
-        r'youtube\.com/embed/([a-zA-Z0-9_-]{11})',
-        r'youtube\.com/v/([a-zA-Z0-9_-]{11})',
-    ]
-    for pattern in url_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _YOUTUBE_URL_RES:
+        match = pattern.search(text)
         if match:
             return match.group(1)
     # Try standalone 11-char ID
-    standalone_match = re.search(r'\b([a-zA-Z0-9_-]{11})\b', text)
-    if standalone_match:
-        return standalone_match.group(1)
-    return None
+    match = _STANDALONE_ID_RE.search(text)
+    return match.group(1) if match else None
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+# Fixed text of the run children python-docx's Run.text renders (w:t and w:br handled apart)
+_RUN_CHILD_TEXT = {_W + 'tab': '\t', _W + 'ptab': '\t', _W + 'cr': '\n', _W + 'noBreakHyphen': '-'}
+
+def _run_text(run) -> str:
+    """Text of one w:r, as python-docx's Run.text renders it (direct children only)."""
+    parts = []
+    for node in run:
+        tag = node.tag
+        if tag == _W + 't':
+            parts.append(node.text or '')
+        elif tag == _W + 'br':
+            # Only line breaks are text; page and column breaks render as nothing
+            if node.get(_W + 'type', 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        elif tag in _RUN_CHILD_TEXT:
+            parts.append(_RUN_CHILD_TEXT[tag])
+    return ''.join(parts)
+
+def _paragraph_text(paragraph) -> str:
+    """
+    Paragraph.text as python-docx renders it: the paragraph's direct runs and the runs of
+    its direct hyperlinks, in order. Text boxes, mc:AlternateContent fallbacks, fields
+    and other nested content are skipped, as they are there.
+    """
+    parts = []
+    for child in paragraph:
+        if child.tag == _W + 'r':
+            parts.append(_run_text(child))
+        elif child.tag == _W + 'hyperlink':
+            parts.extend(_run_text(run) for run in child if run.tag == _W + 'r')
+    return ''.join(parts)
+
+def _iter_paragraph_texts(docx_path: str) -> Iterator[str]:
+    """
+    Yields the text of each top-level paragraph (what doc.paragraphs covers) by streaming
+    word/document.xml, clearing every paragraph once read so memory stays flat.
+    """
+    with zipfile.ZipFile(docx_path) as z, z.open('word/document.xml') as f:
+        for _, elem in etree.iterparse(f, events=('end',), tag=_W + 'p'):
+            parent = elem.getparent()
+            if parent is None or parent.tag != _W + 'body':
+                # Paragraph inside a table, text box, etc.; its container is handled as a whole
+                continue
+            yield _paragraph_text(elem)
+            elem.clear()
+            # Drop already-processed siblings (paragraphs and tables) from the tree
+            while elem.getprevious() is not None:
+                del parent[0]
+
+def _store_transcript(transcripts: Dict[str, str], title: str, transcript_text: str) -> bool:
+    """
+    Maps a transcript by its normalized title and by any YouTube ID in the title.
+    All keys share the one string object; returns whether it was stored.
+    """
+    if len(transcript_text) <= 50:  # Only save if substantial content
+        return False
+    # Map by normalized title
+    transcripts[normalize_title(title)] = transcript_text
+    
+    # Also try to extract YouTube ID from title and map by that too
+    youtube_id = extract_youtube_id_from_text(title)
+    if youtube_id:
+        # Map by YouTube ID (as-is and cleaned)
+        transcripts[youtube_id] = transcript_text
+        if youtube_id.startswith('-') or youtube_id.startswith('_'):
+            transcripts[youtube_id[1:]] = transcript_text
+    
+    logging.debug(f"  Extracted transcript for: {title[:50]}")
+    return True
+
+def _load_docx_cache(cache_key: tuple) -> Optional[Dict[str, str]]:
+    try:
+        with open(DOCX_CACHE_PATH, 'rb') as f:
+            # The key is its own pickle record ahead of the mapping, so a stale cache
+            # is rejected without unpickling every transcript in it
+            if pickle.load(f) != cache_key:
+                return None
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        return None
+
+def _save_docx_cache(cache_key: tuple, transcripts: Dict[str, str]) -> None:
+    try:
+        os.makedirs(os.path.dirname(DOCX_CACHE_PATH), exist_ok=True)
+        # Write then rename, so an interrupted run never leaves a truncated cache behind
+        tmp_path = DOCX_CACHE_PATH + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(cache_key, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(transcripts, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, DOCX_CACHE_PATH)
+    except OSError as e:
+        logging.warning(f"Could not write {DOCX_CACHE_PATH}: {e}")
 
 def parse_transcripts_docx() -> Dict[str, str]:
     """
@@ -51,26 +160,37 @@ def parse_transcripts_docx() -> Dict[str, str]:
         Dict mapping (normalized_title or youtube_id) -> full_transcript_text
         Multiple keys per transcript (by title AND by YouTube ID if found)
     """
-    if not HAS_DOCX:
-        logging.warning("python-docx not available. Skipping .docx parsing.")
+    if not HAS_LXML:
+        logging.warning("lxml not available. Skipping .docx parsing.")
         return {}
     
-    if not os.path.exists(TRANSCRIPTS_DOCX_PATH):
+    # The stat doubles as the existence check
+    try:
+        stat = os.stat(TRANSCRIPTS_DOCX_PATH)
+    except FileNotFoundError:
         logging.warning(f"Transcripts.docx not found at {TRANSCRIPTS_DOCX_PATH}")
         return {}
     
+    cache_key = (DOCX_CACHE_VERSION, os.path.abspath(TRANSCRIPTS_DOCX_PATH), stat.st_mtime_ns, stat.st_size)
+    cached = _load_docx_cache(cache_key)
+    if cached is not None:
+        logging.info(f"Loaded {len(cached)} transcript mapping keys from {DOCX_CACHE_PATH} (unchanged .docx)")
+        return cached
+    
     logging.info(f"Parsing {TRANSCRIPTS_DOCX_PATH}...")
     
     try:
-        doc = Document(TRANSCRIPTS_DOCX_PATH)
         transcripts = {}
+        transcript_count = 0
         current_title = None
-        current_transcript = []
+        current_transcript = io.StringIO()
         
-        for para in doc.paragraphs:
-            text = para.text.strip()
+        # A trailing None sentinel acts as one last title, so the final transcript is saved
+        # by the same code path as every other one
+        for para_text in chain(_iter_paragraph_texts(TRANSCRIPTS_DOCX_PATH), (None,)):
+            text = para_text.strip() if para_text is not None else None
             
-            if not text:
+            if text == '':
                 continue
             
             # Check if this looks like a title (short, might be hyperlink, or formatted differently)
@@ -78,55 +198,31 @@ def parse_transcripts_docx() -> Dict[str, str]:
             # Look for patterns: hyperlinks, bold text, or short lines that could be titles
             
             # If line is short and looks like a title, start new entry
-            if len(text) < 100 and (text.count(' ') < 10):
+            if text is None or (len(text) < 100 and text.count(' ') < 10):
                 # Save previous transcript if exists
-                if current_title and current_transcript:
-                    transcript_text = ' '.join(current_transcript)
-                    if len(transcript_text) > 50:  # Only save if substantial content
-                        # Map by normalized title
-                        normalized = normalize_title(current_title)
-                        transcripts[normalized] = transcript_text
-                        
-                        # Also try to extract YouTube ID from title and map by that too
-                        youtube_id = extract_youtube_id_from_text(current_title)
-                        if youtube_id:
-                            # Map by YouTube ID (as-is and cleaned)
-                            transcripts[youtube_id] = transcript_text
-                            if youtube_id.startswith('-') or youtube_id.startswith('_'):
-                                transcripts[youtube_id[1:]] = transcript_text
-                        
-                        logging.debug(f"  Extracted transcript for: {current_title[:50]}")
+                if current_title and current_transcript.tell():
+                    transcript_count += _store_transcript(transcripts, current_title, current_transcript.getvalue())
                 
                 # Start new entry
                 current_title = text
-                current_transcript = []
+                current_transcript = io.StringIO()
             else:
                 # This is transcript content
                 if current_title:
-                    current_transcript.append(text)
+                    # Paragraphs are written straight into the buffer, space-separated
+                    if current_transcript.tell():
+                        current_transcript.write(' ')
+                    current_transcript.write(text)
                 else:
                     # No title yet, might be at start of doc
                     # Try to extract title from first substantial line
                     if len(text) < 100:
                         current_title = text
-                        current_transcript = []
-        
-        # Save last transcript
-        if current_title and current_transcript:
-            transcript_text = ' '.join(current_transcript)
-            if len(transcript_text) > 50:
-                normalized = normalize_title(current_title)
-                transcripts[normalized] = transcript_text
-                
-                # Also map by YouTube ID if found
-                youtube_id = extract_youtube_id_from_text(current_title)
-                if youtube_id:
-                    transcripts[youtube_id] = transcript_text
-                    if youtube_id.startswith('-') or youtube_id.startswith('_'):
-                        transcripts[youtube_id[1:]] = transcript_text
+                        current_transcript = io.StringIO()
         
-        logging.info(f"  Extracted {len(set(transcripts.values()))} unique transcripts from .docx")
+        logging.info(f"  Extracted {transcript_count} transcripts from .docx")
         logging.info(f"  Created {len(transcripts)} mapping keys (by title and YouTube ID)")
+        _save_docx_cache(cache_key, transcripts)
         return transcripts
         
     except Exception as e:
@@ -137,6 +233,6 @@ if __name__ == "__main__":
     transcripts = parse_transcripts_docx()
     print(f"\nExtracted {len(transcripts)} transcripts")
     print("\nSample titles:")
-    for i, title in enumerate(list(transcripts.keys())[:5]):
-        print(f"  {i+1}. {title}")
+    for i, title in enumerate(islice(transcripts, 5), start=1):
+        print(f"  {i}. {title}")
 
@@ -5,6 +5,28 @@ Quick investigation script for flagship results - no pandas required for basic c
 import json
 import os
 from pathlib import Path
+from typing import Any, Optional, Tuple
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+def _first_video_and_count(json_path: str) -> Tuple[Optional[Any], int]:
+    """
+    First record of the detailed results list and the number of records. With ijson the
+    file is streamed, so only one record (with its raw LLM payload) is in memory at a time.
+    """
+    if HAS_IJSON:
+        with open(json_path, 'rb') as f:
+            items = ijson.items(f, 'item', use_float=True)
+            first_video = next(items, None)
+            total = 0 if first_video is None else 1 + sum(1 for _ in items)
+        return first_video, total
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return (data[0] if data else None), len(data)
 
 def quick_investigation():
     """Quick investigation without pandas."""
@@ -16,15 +38,25 @@ def quick_investigation():
     # Find latest files
     flagship_dir = "model_scores_gold_standard/flagship_run"
     
-    csv_files = sorted([f for f in os.listdir(flagship_dir) if f.startswith("flagship_scores_") and f.endswith(".csv")])
-    json_files = sorted([f for f in os.listdir(flagship_dir) if f.startswith("flagship_scores_detailed_") and f.endswith(".json")])
+    # One directory scan sorts every file into its bucket
+    csv_files, json_files, missing_files = [], [], []
+    with os.scandir(flagship_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith("flagship_scores_") and name.endswith(".csv"):
+                csv_files.append(name)
+            elif name.startswith("flagship_scores_detailed_") and name.endswith(".json"):
+                json_files.append(name)
+            elif name.startswith("missing_transcripts_"):
+                missing_files.append(name)
     
     if not csv_files:
         print("[ERROR] No flagship CSV files found!")
         return
     
-    latest_csv = csv_files[-1]
-    latest_json = json_files[-1] if json_files else None
+    # Names end in a sortable timestamp, so the latest is simply the max
+    latest_csv = max(csv_files)
+    latest_json = max(json_files) if json_files else None
     
     print(f"[FILE] Latest CSV: {latest_csv}")
     if latest_json:
@@ -32,26 +64,31 @@ def quick_investigation():
     
     # Read CSV header and count lines
     csv_path = os.path.join(flagship_dir, latest_csv)
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        header = f.readline().strip()
-        lines = f.readlines()
+    # Rows are counted as newlines over 1 MiB binary chunks, without building a list of lines
+    row_count = 0
+    with open(csv_path, 'rb') as f:
+        header = f.readline().decode('utf-8').strip()
+        last_chunk = b''
+        while chunk := f.read(1 << 20):
+            row_count += chunk.count(b'\n')
+            last_chunk = chunk
+        if last_chunk and not last_chunk.endswith(b'\n'):
+            row_count += 1  # final row without a trailing newline
     
     print(f"\n[CSV] Summary:")
-    print(f"   Total videos: {len(lines)}")
+    print(f"   Total videos: {row_count}")
     print(f"   Columns: {len(header.split(','))}")
     print(f"   Header: {header[:100]}...")
     
     # Read JSON if available
     if latest_json:
         json_path = os.path.join(flagship_dir, latest_json)
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        first_video, total_videos = _first_video_and_count(json_path)
         
         print(f"\n[JSON] Summary:")
-        print(f"   Total videos: {len(data)}")
+        print(f"   Total videos: {total_videos}")
         
-        if len(data) > 0:
-            first_video = data[0]
+        if first_video is not None:
             print(f"\n   Sample video (first):")
             print(f"      Video ID: {first_video.get('video_id', 'N/A')}")
             print(f"      Methods: {list(first_video.get('methods', {}).keys())}")
@@ -67,9 +104,8 @@ def quick_investigation():
                 print(f"      Gemini Flagship scores: {scores}")
     
     # Check missing transcripts
-    missing_files = [f for f in os.listdir(flagship_dir) if f.startswith("missing_transcripts_")]
     if missing_files:
-        latest_missing = sorted(missing_files)[-1]
+        latest_missing = max(missing_files)
         missing_path = os.path.join(flagship_dir, latest_missing)
         with open(missing_path, 'r') as f:
             missing = f.read().strip().split('\n')
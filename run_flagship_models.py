@@ -9,12 +9,14 @@ Models:
 import pandas as pd
 import numpy as np
 import logging
-import json
+import orjson
+import csv
 import os
 import time
 import re
 import argparse
 from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Import analysis functions
@@ -22,7 +24,9 @@ from llm_analyzer import analyze_transcript_with_llm
 from parse_transcripts_docx import parse_transcripts_docx, normalize_title
 
 # Import transcript fetching from the working script (proven logic)
-from run_models_on_gold_standard import get_transcript_for_video, TRANSCRIPT_CACHE
+from run_models_on_gold_standard import get_transcript_for_video, transcript_counts, TRANSCRIPT_CACHE
+# Same 1-5 score normalization as the gold standard run, so both scripts' scores are comparable
+from run_models_on_gold_standard import normalize_llm_score_to_1_5
 
 # MLflow tracking
 try:
@@ -43,46 +47,45 @@ MLFLOW_EXPERIMENT_NAME = "Flagship Models Validation"
 OPENAI_FLAGSHIP_MODEL = "gpt-5.1"  # Can be overridden with "gpt-5" or other models
 GEMINI_FLAGSHIP_MODEL = "models/gemini-3-pro-preview"  # Gemini 3 Pro Preview
 
+# LLM calls in flight at once (across both providers)
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("MAX_CONCURRENT_LLM_CALLS", 8))
+
 # Transcript fetching is imported from run_models_on_gold_standard.py (proven working logic)
 # This ensures both scripts use the exact same transcript matching logic
 
-# ============================================================================
-# SCORE NORMALIZATION (to 1-5 scale)
-# ============================================================================
+# The v5_all_dimensions prompt reports each of these under its own key
+DIMENSIONS = ('opinion_news', 'nuance', 'order_creativity', 'prevention_promotion', 'compassion_contempt')
 
-def normalize_llm_score_to_1_5(score: Any, dimension: str) -> Optional[float]:
-    """
-    Normalize LLM score to 1-5 scale.
-    Handles various output formats from different prompts.
-    """
-    if score is None or (isinstance(score, float) and np.isnan(score)):
-        return None
-    
-    try:
-        score_float = float(score)
-    except (ValueError, TypeError):
-        return None
-    
-    # If already 1-5, return as is (clamped)
-    if 1 <= score_float <= 5:
-        return round(score_float, 4)
-    
-    # If -5 to +5, map to 1-5: (score + 5) / 2
-    if -5 <= score_float <= 5:
-        normalized = (score_float + 5) / 2
-        return round(max(1, min(5, normalized)), 4)
-    
-    # If 0-100, map to 1-5: (score / 20) + 1
-    if 0 <= score_float <= 100:
-        normalized = (score_float / 20) + 1
-        return round(max(1, min(5, normalized)), 4)
-    
-    # If 0-5, map to 1-5: score + 1
-    if 0 <= score_float <= 5:
-        normalized = score_float + 1
-        return round(max(1, min(5, normalized)), 4)
-    
-    return None
+def extract_dimension_scores(result: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """Normalized 1-5 score for every dimension the LLM returned as a dict."""
+    scores = {}
+    for dim in DIMENSIONS:
+        dim_result = result.get(dim, {})
+        if isinstance(dim_result, dict):
+            scores[dim] = normalize_llm_score_to_1_5(dim_result.get('score'), dim)
+    return scores
+
+FLAGSHIP_METHODS = ('openai_flagship', 'gemini_flagship')
+# Fixed column order of the flattened scores CSV. Every {method}_{dimension} column is
+# always present (empty where a method failed), unlike a DataFrame of only the scores seen
+CSV_FIELDNAMES = (
+    ['video_id', 'youtube_id', 'transcript_length', 'transcript_word_count', 'transcript_sentence_count']
+    + [f"{method}_{dim}" for method in FLAGSHIP_METHODS for dim in DIMENSIONS]
+)
+
+def flatten_video_results(video_results: Dict[str, Any]) -> tuple:
+    """One CSV row in CSV_FIELDNAMES order: transcript stats, then each method's score per dimension."""
+    methods = video_results['methods']
+    return (
+        video_results['video_id'],
+        video_results.get('youtube_id'),
+        video_results['transcript_length'],
+        video_results.get('transcript_word_count'),
+        video_results.get('transcript_sentence_count'),
+    ) + tuple(
+        methods.get(method, {}).get('scores', {}).get(dim)
+        for method in FLAGSHIP_METHODS for dim in DIMENSIONS
+    )
 
 # ============================================================================
 # FLAGSHIP MODEL RUNNERS
@@ -99,20 +102,7 @@ def run_openai_flagship(transcript: str, model_name: str = OPENAI_FLAGSHIP_MODEL
         )
         
         # Extract and normalize scores
-        scores = {}
-        dimension_mapping = {
-            'opinion_news': 'opinion_news',
-            'nuance': 'nuance',
-            'order_creativity': 'order_creativity',
-            'prevention_promotion': 'prevention_promotion',
-            'compassion_contempt': 'compassion_contempt'
-        }
-        
-        for dim_key, dim_name in dimension_mapping.items():
-            dim_result = result.get(dim_key, {})
-            if isinstance(dim_result, dict):
-                raw_score = dim_result.get('score')
-                scores[dim_name] = normalize_llm_score_to_1_5(raw_score, dim_name)
+        scores = extract_dimension_scores(result)
         
         return {
             'method': 'openai_flagship',
@@ -142,20 +132,7 @@ def run_gemini_flagship(transcript: str, model_name: str = GEMINI_FLAGSHIP_MODEL
         )
         
         # Extract and normalize scores
-        scores = {}
-        dimension_mapping = {
-            'opinion_news': 'opinion_news',
-            'nuance': 'nuance',
-            'order_creativity': 'order_creativity',
-            'prevention_promotion': 'prevention_promotion',
-            'compassion_contempt': 'compassion_contempt'
-        }
-        
-        for dim_key, dim_name in dimension_mapping.items():
-            dim_result = result.get(dim_key, {})
-            if isinstance(dim_result, dict):
-                raw_score = dim_result.get('score')
-                scores[dim_name] = normalize_llm_score_to_1_5(raw_score, dim_name)
+        scores = extract_dimension_scores(result)
         
         return {
             'method': 'gemini_flagship',
@@ -178,11 +155,29 @@ def run_gemini_flagship(transcript: str, model_name: str = GEMINI_FLAGSHIP_MODEL
 # MAIN PIPELINE
 # ============================================================================
 
-def run_flagship_models_on_gold_standard(
+def _offload_raw_results(video_results: Dict[str, Any], raw_dir: str, position: int) -> None:
+    """
+    Writes each method's full LLM response to its own file under raw_dir and keeps only the
+    path in the record, so all_results and the detailed JSON carry scores, not raw payloads.
+    """
+    os.makedirs(raw_dir, exist_ok=True)
+    safe_id = re.sub(r'[^\w.-]', '_', str(video_results['video_id']))[:80]
+    for method_key, method_result in video_results['methods'].items():
+        raw_result = method_result.get('raw_result')
+        if raw_result is None:
+            continue
+        raw_path = os.path.join(raw_dir, f"{position:04d}_{safe_id}.{method_key}.json")
+        with open(raw_path, 'wb') as f:
+            f.write(orjson.dumps(raw_result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY))
+        method_result['raw_result'] = raw_path
+
+def run_flagship_models_on_gold_standard_to_csv(
     openai_model: str = OPENAI_FLAGSHIP_MODEL,
-    gemini_model: str = GEMINI_FLAGSHIP_MODEL
+    gemini_model: str = GEMINI_FLAGSHIP_MODEL,
+    max_workers: int = MAX_CONCURRENT_LLM_CALLS,
+    keep_raw: bool = False
 ):
-    """Run flagship models on gold standard videos."""
+    """Run flagship models on gold standard videos. Returns (all_results, path of the scores CSV)."""
     logging.info("="*80)
     logging.info("RUNNING FLAGSHIP MODELS ON GOLD STANDARD VIDEOS")
     logging.info(f"OpenAI Model: {openai_model}")
@@ -211,9 +206,10 @@ def run_flagship_models_on_gold_standard(
     
     # Filter out invalid entries (Excel errors like #NAME?)
     initial_count = len(gold_df)
-    gold_df = gold_df[gold_df['video_id'].astype(str).str.strip() != '#NAME?']
-    gold_df = gold_df[gold_df['video_id'].notna()]
-    gold_df = gold_df[gold_df['video_id'].astype(str).str.len() > 0]
+    # One combined mask: a single string conversion and a single slice
+    video_ids = gold_df['video_id']
+    video_id_str = video_ids.astype(str)
+    gold_df = gold_df[video_ids.notna() & (video_id_str.str.strip() != '#NAME?') & (video_id_str.str.len() > 0)]
     
     filtered_count = initial_count - len(gold_df)
     if filtered_count > 0:
@@ -233,16 +229,16 @@ def run_flagship_models_on_gold_standard(
         mlflow.log_param("docx_transcripts_count", 0)
         mlflow.log_param("transcript_source", "history_folder_and_json")
     
-    # Process each video
+    # Process each video: transcripts are gathered first, then the LLM calls run concurrently
     all_results = []
     missing_transcripts = []
+    pending = []
     
-    for idx, row in gold_df.iterrows():
-        video_id = row['video_id']
-        youtube_id = row.get('youtube_id')  # May be NaN
-        
+    # Only two columns are read, so iterate them as plain tuples rather than a Series per row
+    youtube_ids = gold_df.get('youtube_id', pd.Series(None, index=gold_df.index, dtype=object))  # May be NaN
+    for i, (video_id, youtube_id) in enumerate(zip(gold_df['video_id'], youtube_ids), start=1):
         logging.info(f"\n{'='*80}")
-        logging.info(f"Processing video {idx+1}/{len(gold_df)}: {video_id[:50]}")
+        logging.info(f"Processing video {i}/{len(gold_df)}: {video_id[:50]}")
         logging.info(f"{'='*80}")
         
         # Get transcript (handle NaN youtube_id)
@@ -256,97 +252,97 @@ def run_flagship_models_on_gold_standard(
         
         logging.info(f"  Transcript length: {len(transcript)} characters")
         
-        # Run flagship models
-        transcript_words = transcript.split()
-        transcript_sentences = [s for s in transcript.split('.') if s.strip()]
+        word_count, sentence_count = transcript_counts(transcript)
         
         video_results = {
             'video_id': video_id,
             'youtube_id': youtube_id if pd.notna(youtube_id) else None,
             'transcript_length': len(transcript),
-            'transcript_word_count': len(transcript_words),
-            'transcript_sentence_count': len(transcript_sentences),
+            'transcript_word_count': word_count,
+            'transcript_sentence_count': sentence_count,
             'methods': {}
         }
-        
-        # 1. OpenAI Flagship
-        logging.info(f"  Running OpenAI Flagship ({openai_model})...")
-        video_results['methods']['openai_flagship'] = run_openai_flagship(transcript, openai_model)
-        
-        # 2. Gemini Flagship
-        logging.info(f"  Running Gemini Flagship ({gemini_model})...")
-        video_results['methods']['gemini_flagship'] = run_gemini_flagship(transcript, gemini_model)
-        
-        all_results.append(video_results)
-        
-        # Log summary
-        logging.info("\n  --- Scores Summary (1-5 scale) ---")
-        for method_key, method_result in video_results['methods'].items():
-            if method_result.get('error'):
-                logging.info(f"    {method_key:25s}: ERROR - {method_result['error'][:50]}")
-            else:
-                scores_str = ', '.join([f"{k}={v:.2f}" for k, v in method_result['scores'].items()])
-                logging.info(f"    {method_key:25s}: {scores_str}")
+        pending.append((video_results, transcript))
     
-    # Save results
+    # Run flagship models. The calls are network-bound and independent, so both providers
+    # for every video go through one bounded pool instead of running one after another.
+    logging.info(f"\nRunning OpenAI ({openai_model}) and Gemini ({gemini_model}) flagships "
+                 f"on {len(pending)} videos ({max_workers} concurrent calls)...")
+    # The flattened CSV is written row by row as each video completes, so partial results
+    # survive a crash; summary metrics are running totals rather than a DataFrame at the end
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    csv_path = os.path.join(run_output_dir, f"flagship_scores_{timestamp}.csv")
+    raw_dir = os.path.join(run_output_dir, f"raw_{timestamp}")
+    total_length = total_words = 0
+    success_counts = dict.fromkeys(FLAGSHIP_METHODS, 0)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool, \
+            open(csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+        # Rows are positional tuples in the fixed schema order, so no per-row dict is built
+        # LF line endings, as DataFrame.to_csv wrote them
+        writer = csv.writer(csv_file, lineterminator='\n')
+        writer.writerow(CSV_FIELDNAMES)
+        futures = [
+            (video_results,
+             pool.submit(run_openai_flagship, transcript, openai_model),
+             pool.submit(run_gemini_flagship, transcript, gemini_model))
+            for video_results, transcript in pending
+        ]
+        for i, (video_results, openai_future, gemini_future) in enumerate(futures, start=1):
+            video_results['methods']['openai_flagship'] = openai_future.result()
+            video_results['methods']['gemini_flagship'] = gemini_future.result()
+            if not keep_raw:
+                _offload_raw_results(video_results, raw_dir, i)
+            all_results.append(video_results)
+            writer.writerow(flatten_video_results(video_results))
+            csv_file.flush()
+            total_length += video_results['transcript_length']
+            total_words += video_results['transcript_word_count']
+            for method_key in FLAGSHIP_METHODS:
+                if video_results['methods'][method_key]['scores'].get(DIMENSIONS[0]) is not None:
+                    success_counts[method_key] += 1
+            
+            # Log summary
+            logging.info(f"\n  --- Scores Summary (1-5 scale): {video_results['video_id'][:50]} ---")
+            for method_key, method_result in video_results['methods'].items():
+                if method_result.get('error'):
+                    logging.info(f"    {method_key:25s}: ERROR - {method_result['error'][:50]}")
+                else:
+                    scores_str = ', '.join([f"{k}={v:.2f}" for k, v in method_result['scores'].items()])
+                    logging.info(f"    {method_key:25s}: {scores_str}")
+    
+    logging.info(f"\n✓ Flagship scores CSV saved to: {csv_path}")
+    if HAS_MLFLOW:
+        mlflow.log_artifact(csv_path, "flagship_scores")
     
+    # Save the remaining results
     # 1. Save detailed JSON
     json_path = os.path.join(run_output_dir, f"flagship_scores_detailed_{timestamp}.json")
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(all_results, f, indent=2, ensure_ascii=False)
+    # orjson writes UTF-8 bytes directly (same output shape as indent=2, ensure_ascii=False)
+    with open(json_path, 'wb') as f:
+        f.write(orjson.dumps(all_results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY))
     logging.info(f"\n✓ Detailed results saved to: {json_path}")
     
     if HAS_MLFLOW:
         mlflow.log_artifact(json_path, "detailed_results")
     
-    # 2. Create flattened CSV for easy comparison
-    flattened_data = []
-    for result in all_results:
-        row = {
-            'video_id': result['video_id'],
-            'youtube_id': result.get('youtube_id'),
-            'transcript_length': result['transcript_length'],
-            'transcript_word_count': result.get('transcript_word_count'),
-            'transcript_sentence_count': result.get('transcript_sentence_count')
-        }
-        
-        # Add scores from each method
-        for method_key, method_result in result['methods'].items():
-            for dim, score in method_result.get('scores', {}).items():
-                col_name = f"{method_key}_{dim}"
-                row[col_name] = score
-        
-        flattened_data.append(row)
-    
-    df_scores = pd.DataFrame(flattened_data)
-    csv_path = os.path.join(run_output_dir, f"flagship_scores_{timestamp}.csv")
-    df_scores.to_csv(csv_path, index=False)
-    logging.info(f"✓ Flagship scores CSV saved to: {csv_path}")
-    
-    if HAS_MLFLOW:
-        mlflow.log_artifact(csv_path, "flagship_scores")
-    
-    # 3. Save missing transcripts list
+    # 2. Save missing transcripts list
     if missing_transcripts:
         missing_path = os.path.join(run_output_dir, f"missing_transcripts_{timestamp}.txt")
         with open(missing_path, 'w') as f:
             f.write('\n'.join(missing_transcripts))
         logging.info(f"⚠ {len(missing_transcripts)} videos missing transcripts (saved to {missing_path})")
     
-    # 4. Log summary metrics to MLflow
+    # 3. Log summary metrics to MLflow
     if HAS_MLFLOW:
         mlflow.log_metric("videos_processed", len(all_results))
         mlflow.log_metric("videos_missing_transcripts", len(missing_transcripts))
-        mlflow.log_metric("avg_transcript_length", df_scores['transcript_length'].mean() if len(df_scores) > 0 else 0)
-        mlflow.log_metric("avg_word_count", df_scores['transcript_word_count'].mean() if len(df_scores) > 0 else 0)
+        processed = len(all_results)
+        mlflow.log_metric("avg_transcript_length", total_length / processed if processed > 0 else 0)
+        mlflow.log_metric("avg_word_count", total_words / processed if processed > 0 else 0)
         
         # Log success rates per method
-        for method in ['openai_flagship', 'gemini_flagship']:
-            method_cols = [c for c in df_scores.columns if c.startswith(f"{method}_")]
-            if method_cols:
-                success_count = df_scores[method_cols[0]].notna().sum()
-                mlflow.log_metric(f"{method}_success_rate", success_count / len(df_scores) if len(df_scores) > 0 else 0)
+        for method in FLAGSHIP_METHODS:
+            mlflow.log_metric(f"{method}_success_rate", success_counts[method] / processed if processed > 0 else 0)
     
     logging.info(f"\n✅ Completed! Processed {len(all_results)} videos")
     logging.info(f"   Results saved to: {run_output_dir}/")
@@ -355,7 +351,7 @@ def run_flagship_models_on_gold_standard(
         mlflow.end_run()
         logging.info(f"   MLflow run logged: {run_name}")
     
-    return all_results, df_scores
+    return all_results, csv_path
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Run flagship models on gold standard videos')
@@ -363,13 +359,19 @@ if __name__ == "__main__":
                        help=f'OpenAI model name (default: {OPENAI_FLAGSHIP_MODEL})')
     parser.add_argument('--gemini-model', type=str, default=GEMINI_FLAGSHIP_MODEL,
                        help=f'Gemini model name (default: {GEMINI_FLAGSHIP_MODEL})')
+    parser.add_argument('--max-workers', type=int, default=MAX_CONCURRENT_LLM_CALLS,
+                       help=f'Concurrent LLM calls (default: {MAX_CONCURRENT_LLM_CALLS})')
+    parser.add_argument('--keep-raw', action='store_true',
+                       help='Keep full LLM responses inline in the detailed JSON (default: one file per response under raw_<timestamp>/)')
     
     args = parser.parse_args()
     
     try:
-        results, scores_df = run_flagship_models_on_gold_standard(
+        results, csv_path = run_flagship_models_on_gold_standard_to_csv(
             openai_model=args.openai_model,
-            gemini_model=args.gemini_model
+            gemini_model=args.gemini_model,
+            max_workers=args.max_workers,
+            keep_raw=args.keep_raw
         )
         print(f"\n{'='*80}")
         print(f"SUCCESS! Processed {len(results)} videos with flagship models")
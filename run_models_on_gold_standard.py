@@ -13,22 +13,34 @@ Models:
 import pandas as pd
 import numpy as np
 import logging
-import json
+import orjson
 import os
+import pickle
 import time
 import re
+import sys
 import argparse
 import glob
-from typing import Dict, List, Any, Optional
+import hashlib
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 
 # Import analysis functions
-from models import run_go_emotions, RESPECT, CONTEMPT
+from models import run_go_emotions, run_go_emotions_batch, RESPECT, CONTEMPT
 from scale import run_valence_analysis
 from llm_analyzer import analyze_transcript_with_llm
 from build import fetch_transcript
 from parse_transcripts_docx import parse_transcripts_docx, normalize_title
 
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
 # MLflow tracking
 try:
     import mlflow
@@ -42,57 +54,209 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 GOLD_STANDARD_PATH = "validation_results/human_scores_cleaned.csv"
 OUTPUT_DIR = "model_scores_gold_standard"
 MLFLOW_EXPERIMENT_NAME = "Gold Standard Model Validation"
+# LLM requests in flight at once across all videos (4 per video)
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("MAX_CONCURRENT_LLM_CALLS", 8))
+# Videos whose sentences go through RoBERTa together in one batched classifier call
+ROBERTA_BATCH_VIDEOS = int(os.getenv("ROBERTA_BATCH_VIDEOS", 16))
 
-# Transcript cache to avoid re-reading
-TRANSCRIPT_CACHE = {}
+# Resolved transcripts persist here between runs, so a cold start is one pickle load
+TRANSCRIPT_CACHE_PATH = ".cache/gold_standard_transcripts.pkl"
+
+# Cache entry: (source file the transcript came from, its st_mtime_ns, transcript)
+CacheEntry = Tuple[str, int, str]
+
+def _load_transcript_cache() -> Dict[str, CacheEntry]:
+    try:
+        with open(TRANSCRIPT_CACHE_PATH, 'rb') as f:
+            cache = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return {}
+    if not isinstance(cache, dict):
+        return {}
+    # Entries without a source stamp (older cache format) can't be validated, so drop them
+    return {k: v for k, v in cache.items() if isinstance(v, tuple) and len(v) == 3}
+
+def _save_transcript_cache(cache: Dict[str, CacheEntry]) -> None:
+    try:
+        os.makedirs(os.path.dirname(TRANSCRIPT_CACHE_PATH), exist_ok=True)
+        # Write then rename, so an interrupted run never leaves a truncated cache behind
+        tmp_path = TRANSCRIPT_CACHE_PATH + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, TRANSCRIPT_CACHE_PATH)
+    except OSError as e:
+        logging.warning(f"Could not write {TRANSCRIPT_CACHE_PATH}: {e}")
+
+# Transcript cache to avoid re-reading (keyed by every candidate ID of a found transcript).
+# Each hit is checked against its source file's mtime, so edited transcripts are re-read.
+TRANSCRIPT_CACHE = _load_transcript_cache()
+
+def _cached_transcript(key: str) -> Optional[str]:
+    """The cached transcript for key, or None if absent or its source file has changed since."""
+    entry = TRANSCRIPT_CACHE.get(key)
+    if entry is None:
+        return None
+    source_path, mtime_ns, transcript = entry
+    try:
+        if os.stat(source_path).st_mtime_ns == mtime_ns:
+            return transcript
+    except OSError:
+        pass
+    del TRANSCRIPT_CACHE[key]
+    return None
 
 # ============================================================================
 # TRANSCRIPT FETCHING
 # ============================================================================
 
+def _candidate_ids(video_id: str, youtube_id: Optional[str]) -> List[str]:
+    """
+    IDs a video's transcript may be stored under, in lookup order: youtube_id, then video_id,
+    each as-is and without a leading dash/underscore. Deduped (dict.fromkeys keeps the order)
+    and interned, since the same IDs recur as keys in the persisted transcript cache.
+    """
+    ids = []
+    # Add youtube_id if available (handle NaN, None, empty string)
+    if youtube_id is not None:
+        try:
+            if pd.notna(youtube_id):
+                ids.append(str(youtube_id).strip())
+        except (TypeError, ValueError):
+            pass
+    if video_id:
+        ids.append(str(video_id).strip())
+    
+    expanded = []
+    for candidate in ids:
+        if candidate:
+            expanded.append(candidate)
+            # Also try without leading dash/underscore
+            if candidate[0] in '-_':
+                expanded.append(candidate[1:])
+    return [sys.intern(candidate) for candidate in dict.fromkeys(expanded) if candidate]
+
 def get_transcript_from_previous_run_json(video_id: str, youtube_id: Optional[str]) -> Optional[str]:
     """
     Extract transcript from previous successful run JSON files.
     This is a fallback if transcripts/history/ doesn't have the file.
     """
-    candidate_ids = []
-    if youtube_id and pd.notna(youtube_id):
-        candidate_ids.append(str(youtube_id).strip())
-    if video_id:
-        candidate_ids.append(str(video_id).strip())
-        # Also try without leading dash/underscore
-        if video_id.startswith('-') or video_id.startswith('_'):
-            candidate_ids.append(video_id[1:])
-    
-    # Check run_1 and run_2 JSON files
-    for run_dir in ["run_1", "run_2"]:
+    found = _find_in_previous_run_json(_candidate_ids(video_id, youtube_id))
+    return found[0] if found else None
+
+# Previous runs whose detailed JSON holds transcripts, in lookup priority order
+PREVIOUS_RUN_DIRS = ("run_1", "run_2")
+# id -> (position of the entry across all files, transcript, JSON file); built on first use
+_previous_run_index: Optional[Dict[str, Tuple[int, str, str]]] = None
+
+def _iter_json_array(json_path: str) -> Iterator[Any]:
+    """
+    Yields the elements of a JSON array file. With ijson the file is streamed, so only one
+    video's results (with all its raw LLM payloads) are in memory at a time.
+    """
+    with open(json_path, 'rb') as f:
+        if HAS_IJSON:
+            yield from ijson.items(f, 'item', use_float=True)
+        else:
+            # orjson parses the raw bytes directly, several times faster than json.load
+            yield from orjson.loads(f.read())
+
+def _previous_run_transcript_index() -> Dict[str, Tuple[int, str, str]]:
+    """
+    Every previous-run JSON file is parsed once, and each entry's video_id and youtube_id
+    are indexed to its roberta_valence transcript, rather than re-parsing every file per video.
+    """
+    global _previous_run_index
+    if _previous_run_index is not None:
+        return _previous_run_index
+    index = {}
+    position = 0
+    for run_dir in PREVIOUS_RUN_DIRS:
         json_files = glob.glob(f"model_scores_gold_standard/{run_dir}/model_scores_detailed_*.json")
         for json_file in json_files:
             try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    results = json.load(f)
-                for video_result in results:
+                for video_result in _iter_json_array(json_file):
+                    # Extract transcript from roberta_valence
+                    methods = video_result.get('methods', {})
+                    roberta_valence = methods.get('roberta_valence', {})
+                    raw_result = roberta_valence.get('raw_result') or {}
+                    transcript = raw_result.get('transcript')
+                    if not transcript or len(transcript) <= 50:
+                        continue
+                    position += 1
                     vid = video_result.get('video_id')
                     yid = video_result.get('youtube_id')
-                    
-                    # Check if this video matches
-                    if vid in candidate_ids or (yid and str(yid).strip() in candidate_ids):
-                        # Extract transcript from roberta_valence
-                        methods = video_result.get('methods', {})
-                        roberta_valence = methods.get('roberta_valence', {})
-                        raw_result = roberta_valence.get('raw_result', {})
-                        if 'transcript' in raw_result:
-                            transcript = raw_result['transcript']
-                            if len(transcript) > 50:
-                                logging.info(f"  Found transcript in previous run JSON: {json_file}")
-                                return transcript
+                    for key in (vid, str(yid).strip() if yid else None):
+                        if key:
+                            # The first entry seen for an ID wins, as with the old linear scan
+                            index.setdefault(key, (position, transcript, json_file))
             except Exception as e:
                 logging.debug(f"  Error reading JSON file {json_file}: {e}")
                 continue
-    return None
+    _previous_run_index = index
+    return index
+
+def _find_in_previous_run_json(candidate_ids: List[str]) -> Optional[Tuple[str, str]]:
+    """get_transcript_from_previous_run_json for precomputed candidate IDs, also returning the JSON file."""
+    index = _previous_run_transcript_index()
+    hits = [index[cid] for cid in candidate_ids if cid in index]
+    if not hits:
+        return None
+    # Earliest entry matching any candidate, the one a front-to-back scan would have found
+    _, transcript, json_file = min(hits)
+    logging.info(f"  Found transcript in previous run JSON: {json_file}")
+    return transcript, json_file
+
+# Folders holding {id}.txt transcripts, in lookup priority order
+TRANSCRIPT_FOLDERS = ("history", "temp_videos")
+_transcript_files: Optional[Dict[str, List[str]]] = None
+
+def _transcript_file_index() -> Dict[str, List[str]]:
+    """
+    Maps each transcript ID to its .txt paths across TRANSCRIPT_FOLDERS (in priority order).
+    Built from one directory scan per folder on first use, instead of probing every
+    candidate path in every folder for every video.
+    """
+    global _transcript_files
+    if _transcript_files is None:
+        index = {}
+        for folder in TRANSCRIPT_FOLDERS:
+            try:
+                with os.scandir(os.path.join("transcripts", folder)) as entries:
+                    for entry in entries:
+                        # is_file() answers from the directory listing itself, without a stat call
+                        if entry.name.endswith('.txt') and entry.is_file():
+                            index.setdefault(entry.name[:-4], []).append(entry.path)
+            except FileNotFoundError:
+                continue
+        _transcript_files = index
+    return _transcript_files
+
+def index_docx_transcripts(docx_transcripts: Dict[str, str]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Returns (docx_raw, docx_norm): the parsed .docx mapping as-is, plus the same transcripts
+    keyed by normalize_title(key). Built once per run so lookups never re-normalize the dict.
+    """
+    docx_norm = {normalize_title(k): v for k, v in docx_transcripts.items()}
+    return docx_transcripts, docx_norm
+
+def _cache_transcript(candidate_ids: List[str], transcript: str, source_path: str,
+                      mtime_ns: Optional[int] = None) -> None:
+    """
+    Caches a found transcript under every candidate ID, so a later lookup by any of them hits.
+    The entry is stamped with its source file's mtime (read here unless already known).
+    """
+    if mtime_ns is None:
+        try:
+            mtime_ns = os.stat(source_path).st_mtime_ns
+        except OSError:
+            return
+    entry = (source_path, mtime_ns, transcript)
+    for candidate_id in candidate_ids:
+        TRANSCRIPT_CACHE[candidate_id] = entry
 
 def get_transcript_for_video(video_id: str, youtube_id: Optional[str], 
-                              docx_transcripts: Dict[str, str]) -> Optional[str]:
+                              docx_transcripts: Dict[str, str],
+                              docx_norm: Optional[Dict[str, str]] = None) -> Optional[str]:
     """
     Get transcript for a video, trying multiple sources:
     1. From transcripts/history/{youtube_id}.txt (fastest, from extracted JSON)
@@ -101,69 +265,60 @@ def get_transcript_for_video(video_id: str, youtube_id: Optional[str],
     4. Skip .docx (not reliable)
     5. Skip yt-dlp to avoid hitting YouTube servers
     """
-    # Get candidate IDs to try (youtube_id and video_id, both as-is and cleaned)
-    candidate_ids = []
+    # Fast path: the raw youtube_id is the first candidate, so a cache hit on it skips
+    # candidate expansion without changing which transcript wins
+    if isinstance(youtube_id, str) and (transcript := _cached_transcript(youtube_id)) is not None:
+        logging.info(f"  Using cached transcript for {video_id[:30]}")
+        return transcript
     
-    # Add youtube_id if available (handle NaN, None, empty string)
-    if youtube_id is not None:
-        try:
-            if pd.notna(youtube_id):
-                youtube_id_str = str(youtube_id).strip()
-                if youtube_id_str and len(youtube_id_str) > 0:
-                    candidate_ids.append(youtube_id_str)
-                    # Also try without leading dash/underscore
-                    if youtube_id_str.startswith('-') or youtube_id_str.startswith('_'):
-                        candidate_ids.append(youtube_id_str[1:])
-        except:
-            pass
+    candidate_ids = _candidate_ids(video_id, youtube_id)
     
-    # Add video_id
-    if video_id:
-        video_id_str = str(video_id).strip()
-        if video_id_str and video_id_str not in candidate_ids:
-            candidate_ids.append(video_id_str)
-        # Also try without leading dash/underscore
-        if video_id_str and (video_id_str.startswith('-') or video_id_str.startswith('_')):
-            cleaned = video_id_str[1:]
-            if cleaned not in candidate_ids:
-                candidate_ids.append(cleaned)
-    
-    # Check cache first (use first candidate as cache key)
-    cache_key = candidate_ids[0] if candidate_ids else video_id
-    if cache_key in TRANSCRIPT_CACHE:
-        logging.info(f"  Using cached transcript for {video_id[:30]}")
-        return TRANSCRIPT_CACHE[cache_key]
+    # Check cache first (found transcripts are cached under every candidate ID)
+    for candidate_id in candidate_ids:
+        if (transcript := _cached_transcript(candidate_id)) is not None:
+            logging.info(f"  Using cached transcript for {video_id[:30]}")
+            return transcript
     
-    # Try transcripts/history and temp_videos folders with all candidate IDs
+    # Try transcripts/history and temp_videos folders with all candidate IDs:
+    # one index lookup per candidate, and only files that exist are opened
+    file_index = _transcript_file_index()
     for candidate_id in candidate_ids:
-        for folder in ["history", "temp_videos"]:
-            transcript_file = os.path.join("transcripts", folder, f"{candidate_id}.txt")
-            if os.path.exists(transcript_file):
-                logging.info(f"  Found transcript file: {transcript_file}")
-                try:
-                    with open(transcript_file, 'r', encoding='utf-8') as f:
-                        transcript = f.read().strip()
-                    if len(transcript) > 50:  # Only return if substantial content
-                        TRANSCRIPT_CACHE[cache_key] = transcript
-                        return transcript
-                except Exception as e:
-                    logging.warning(f"  Error reading transcript file: {e}")
+        for transcript_file in file_index.get(candidate_id, ()):
+            try:
+                with open(transcript_file, 'r', encoding='utf-8') as f:
+                    transcript = f.read().strip()
+                    mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            except (OSError, UnicodeDecodeError) as e:
+                logging.warning(f"  Error reading transcript file: {e}")
+                continue
+            logging.info(f"  Found transcript file: {transcript_file}")
+            if len(transcript) > 50:  # Only return if substantial content
+                _cache_transcript(candidate_ids, transcript, transcript_file, mtime_ns)
+                return transcript
     
     # Try previous run JSON files (extract from roberta_valence)
-    transcript = get_transcript_from_previous_run_json(video_id, youtube_id)
-    if transcript:
-        TRANSCRIPT_CACHE[cache_key] = transcript
+    found = _find_in_previous_run_json(candidate_ids)
+    if found:
+        transcript, json_file = found
+        _cache_transcript(candidate_ids, transcript, json_file)
         return transcript
     
     # Skip .docx - not reliable, transcripts are in JSON files
     # Only try .docx as absolute last resort (commented out for now)
-    # If needed, uncomment below:
+    # If needed, uncomment below (docx_norm comes from index_docx_transcripts; the
+    # normalized candidates are computed once, deduped, and only after direct matches fail):
     # for candidate_id in candidate_ids:
-    #     if candidate_id in docx_transcripts:
-    #         logging.info(f"  Found transcript in .docx (direct match) for {candidate_id[:30]}")
-    #         transcript = docx_transcripts[candidate_id]
-    #         if len(transcript) > 50:
-    #             TRANSCRIPT_CACHE[cache_key] = transcript
+    #     transcript = docx_transcripts.get(candidate_id)
+    #     if transcript and len(transcript) > 50:
+    #         _cache_transcript(candidate_ids, transcript, TRANSCRIPTS_DOCX_PATH)
+    #         return transcript
+    # if docx_norm:
+    #     for normalized_id in dict.fromkeys(map(normalize_title, candidate_ids)):
+    #         transcript = docx_norm.get(normalized_id)
+    #         if transcript and len(transcript) > 50:
+    #             _cache_transcript(candidate_ids, transcript, TRANSCRIPTS_DOCX_PATH)
     #             return transcript
     
     logging.warning(f"  Could not get transcript for {video_id} (youtube_id: {youtube_id}) (skipping yt-dlp)")
@@ -178,7 +333,7 @@ def normalize_llm_score_to_1_5(score: Any, dimension: str) -> Optional[float]:
     Normalize LLM score to 1-5 scale.
     Handles various output formats from different prompts.
     """
-    if score is None or (isinstance(score, float) and np.isnan(score)):
+    if score is None or score != score:  # NaN is the only value not equal to itself
         return None
     
     try:
@@ -186,27 +341,61 @@ def normalize_llm_score_to_1_5(score: Any, dimension: str) -> Optional[float]:
     except (ValueError, TypeError):
         return None
     
-    # If already 1-5, return as is (clamped)
-    if 1 <= score_float <= 5:
-        return round(score_float, 4)
-    
-    # If -5 to +5, map to 1-5: (score + 5) / 2
-    if -5 <= score_float <= 5:
-        normalized = (score_float + 5) / 2
-        return round(max(1, min(5, normalized)), 4)
-    
-    # If 0-100, map to 1-5: (score / 20) + 1
-    if 0 <= score_float <= 100:
-        normalized = (score_float / 20) + 1
-        return round(max(1, min(5, normalized)), 4)
-    
-    # If 0-5, map to 1-5: score + 1
-    if 0 <= score_float <= 5:
-        normalized = score_float + 1
-        return round(max(1, min(5, normalized)), 4)
+    return _normalize_llm_float(score_float)
+
+# (low, high, shift, divisor, offset), checked in order; a 0-5 range would never be reached
+# since 0-1 is caught by -5..+5 and 1-5 by the first entry. Dividing (rather than
+# multiplying by 0.05 etc.) keeps results bit-identical to the original formulas.
+_SCORE_RANGES = (
+    (1, 5, 0, 1, 0),        # already 1-5, returned as is
+    (-5, 5, 5, 2, 0),       # -5 to +5: (score + 5) / 2
+    (0, 100, 0, 20, 1),     # 0-100: (score / 20) + 1
+)
+
+@lru_cache(maxsize=1024)
+def _normalize_llm_float(score_float: float) -> Optional[float]:
+    """Range detection and rescaling for normalize_llm_score_to_1_5; LLM scores repeat a lot."""
+    # First range containing the score picks its affine map to 1-5
+    for low, high, shift, divisor, offset in _SCORE_RANGES:
+        if low <= score_float <= high:
+            return round(max(1, min(5, (score_float + shift) / divisor + offset)), 4)
     
     return None
 
+def _score_to_float(score: Any) -> float:
+    """A raw LLM score as a float, NaN when it is missing or not numeric."""
+    try:
+        return float(score)
+    except (ValueError, TypeError):
+        return np.nan
+
+# Clipped values that the scalar normalizer returns as the int bounds
+_CLAMP_BOUNDS = {1.0: 1, 5.0: 5}
+
+def normalize_llm_scores_to_1_5(scores: List[Any]) -> List[Optional[float]]:
+    """
+    normalize_llm_score_to_1_5 over several raw scores at once (e.g. all dimensions of one
+    response): range detection and rescaling are one vectorized pass over _SCORE_RANGES.
+    """
+    raw = np.fromiter(map(_score_to_float, scores), dtype=np.float64, count=len(scores))
+    # np.select takes the first range containing each score, like the scalar loop;
+    # NaN matches no range and stays NaN
+    normalized = np.clip(np.select(
+        [(raw >= low) & (raw <= high) for low, high, *_ in _SCORE_RANGES],
+        [(raw + shift) / divisor + offset for _, _, shift, divisor, offset in _SCORE_RANGES],
+        default=np.nan,
+    ), 1, 5)
+    # Python's round() rather than np.round, which can differ in the 4th decimal. The
+    # scalar max(1, min(5, x)) returns the int bound at or past either end, so do the same
+    return [None if value != value else _CLAMP_BOUNDS.get(value) or round(value, 4)
+            for value in normalized.tolist()]
+
+# Emotion groups as fixed tuples, with matching 0 defaults for missing emotions
+_RESPECT_KEYS = tuple(sorted(RESPECT))
+_CONTEMPT_KEYS = tuple(sorted(CONTEMPT))
+_RESPECT_ZEROS = (0,) * len(_RESPECT_KEYS)
+_CONTEMPT_ZEROS = (0,) * len(_CONTEMPT_KEYS)
+
 def normalize_roberta_plain_to_1_5(roberta_result: Dict) -> Optional[float]:
     """
     Normalize RoBERTa plain (respect/contempt) to 1-5 scale.
@@ -214,11 +403,9 @@ def normalize_roberta_plain_to_1_5(roberta_result: Dict) -> Optional[float]:
     """
     avg_scores = roberta_result.get("average_scores", {})
     
-    respect_scores = [avg_scores.get(emo, 0) for emo in RESPECT]
-    contempt_scores = [avg_scores.get(emo, 0) for emo in CONTEMPT]
-    
-    avg_respect = sum(respect_scores) / len(respect_scores) if respect_scores else 0
-    avg_contempt = sum(contempt_scores) / len(contempt_scores) if contempt_scores else 0
+    # Sums go straight through dict.get (C level) with no intermediate lists
+    avg_respect = sum(map(avg_scores.get, _RESPECT_KEYS, _RESPECT_ZEROS)) / len(_RESPECT_KEYS) if _RESPECT_KEYS else 0
+    avg_contempt = sum(map(avg_scores.get, _CONTEMPT_KEYS, _CONTEMPT_ZEROS)) / len(_CONTEMPT_KEYS) if _CONTEMPT_KEYS else 0
     
     net_score = avg_respect - avg_contempt  # ranges from -1 to +1
     score_0_5 = 2.5 + (net_score * 2.5)  # map to 0-5
@@ -240,149 +427,45 @@ def normalize_roberta_valence_to_1_5(valence_result: Dict) -> Optional[float]:
 # MODEL RUNNERS
 # ============================================================================
 
-def run_openai_without_roberta(transcript: str) -> Dict[str, Any]:
-    """Run OpenAI LLM without RoBERTa context (all 5 dimensions)."""
-    try:
-        result = analyze_transcript_with_llm(transcript, "openai", "v5_all_dimensions")
-        
-        # Extract and normalize scores
-        scores = {}
-        dimension_mapping = {
-            'opinion_news': 'opinion_news',
-            'nuance': 'nuance',
-            'order_creativity': 'order_creativity',
-            'prevention_promotion': 'prevention_promotion',
-            'compassion_contempt': 'compassion_contempt'
-        }
-        
-        for dim_key, dim_name in dimension_mapping.items():
-            dim_result = result.get(dim_key, {})
-            if isinstance(dim_result, dict):
-                raw_score = dim_result.get('score')
-                scores[dim_name] = normalize_llm_score_to_1_5(raw_score, dim_name)
-        
-        return {
-            'method': 'openai_no_roberta',
-            'scores': scores,
-            'raw_result': result,
-            'error': None
-        }
-    except Exception as e:
-        logging.error(f"  Error in OpenAI (no RoBERTa): {e}")
-        return {
-            'method': 'openai_no_roberta',
-            'scores': {},
-            'raw_result': None,
-            'error': str(e)
-        }
-
-def run_openai_with_roberta(transcript: str) -> Dict[str, Any]:
-    """Run OpenAI LLM with RoBERTa context (all 5 dimensions)."""
-    try:
-        result = analyze_transcript_with_llm(transcript, "openai", "v5_all_dimensions_context")
-        
-        # Extract and normalize scores
-        scores = {}
-        dimension_mapping = {
-            'opinion_news': 'opinion_news',
-            'nuance': 'nuance',
-            'order_creativity': 'order_creativity',
-            'prevention_promotion': 'prevention_promotion',
-            'compassion_contempt': 'compassion_contempt'
-        }
-        
-        for dim_key, dim_name in dimension_mapping.items():
-            dim_result = result.get(dim_key, {})
-            if isinstance(dim_result, dict):
-                raw_score = dim_result.get('score')
-                scores[dim_name] = normalize_llm_score_to_1_5(raw_score, dim_name)
-        
-        return {
-            'method': 'openai_with_roberta',
-            'scores': scores,
-            'raw_result': result,
-            'error': None
-        }
-    except Exception as e:
-        logging.error(f"  Error in OpenAI (with RoBERTa): {e}")
-        return {
-            'method': 'openai_with_roberta',
-            'scores': {},
-            'raw_result': None,
-            'error': str(e)
-        }
+# LLM output keys, which are also the score dimension names
+_LLM_DIMENSIONS = ('opinion_news', 'nuance', 'order_creativity', 'prevention_promotion', 'compassion_contempt')
 
-def run_gemini_without_roberta(transcript: str) -> Dict[str, Any]:
-    """Run Gemini LLM without RoBERTa context (all 5 dimensions)."""
+def _run_llm(transcript: str, provider: str, prompt_version: str, method: str, label: str) -> Dict[str, Any]:
+    """Run one LLM configuration from LLM_RUNNERS (all 5 dimensions) and normalize its scores."""
     try:
-        result = analyze_transcript_with_llm(transcript, "gemini", "v5_all_dimensions")
-        
-        # Extract and normalize scores
-        scores = {}
-        dimension_mapping = {
-            'opinion_news': 'opinion_news',
-            'nuance': 'nuance',
-            'order_creativity': 'order_creativity',
-            'prevention_promotion': 'prevention_promotion',
-            'compassion_contempt': 'compassion_contempt'
-        }
+        result = analyze_transcript_with_llm(transcript, provider, prompt_version)
         
-        for dim_key, dim_name in dimension_mapping.items():
-            dim_result = result.get(dim_key, {})
-            if isinstance(dim_result, dict):
-                raw_score = dim_result.get('score')
-                scores[dim_name] = normalize_llm_score_to_1_5(raw_score, dim_name)
+        # Extract and normalize scores (all dimensions in one vectorized pass)
+        dim_results = [(dim, result.get(dim, {})) for dim in _LLM_DIMENSIONS]
+        dim_results = [(dim, dim_result) for dim, dim_result in dim_results if isinstance(dim_result, dict)]
+        scores = dict(zip(
+            (dim for dim, _ in dim_results),
+            normalize_llm_scores_to_1_5([dim_result.get('score') for _, dim_result in dim_results]),
+        ))
         
         return {
-            'method': 'gemini_no_roberta',
+            'method': method,
             'scores': scores,
             'raw_result': result,
             'error': None
         }
     except Exception as e:
-        logging.error(f"  Error in Gemini (no RoBERTa): {e}")
+        logging.error(f"  Error in {label}: {e}")
         return {
-            'method': 'gemini_no_roberta',
+            'method': method,
             'scores': {},
             'raw_result': None,
             'error': str(e)
         }
 
-def run_gemini_with_roberta(transcript: str) -> Dict[str, Any]:
-    """Run Gemini LLM with RoBERTa context (all 5 dimensions)."""
-    try:
-        result = analyze_transcript_with_llm(transcript, "gemini", "v5_all_dimensions_context")
-        
-        # Extract and normalize scores
-        scores = {}
-        dimension_mapping = {
-            'opinion_news': 'opinion_news',
-            'nuance': 'nuance',
-            'order_creativity': 'order_creativity',
-            'prevention_promotion': 'prevention_promotion',
-            'compassion_contempt': 'compassion_contempt'
-        }
-        
-        for dim_key, dim_name in dimension_mapping.items():
-            dim_result = result.get(dim_key, {})
-            if isinstance(dim_result, dict):
-                raw_score = dim_result.get('score')
-                scores[dim_name] = normalize_llm_score_to_1_5(raw_score, dim_name)
-        
-        return {
-            'method': 'gemini_with_roberta',
-            'scores': scores,
-            'raw_result': result,
-            'error': None
-        }
-    except Exception as e:
-        logging.error(f"  Error in Gemini (with RoBERTa): {e}")
-        return {
-            'method': 'gemini_with_roberta',
-            'scores': {},
-            'raw_result': None,
-            'error': str(e)
-        }
+# (method key, provider, prompt version, log label) for the four LLM configurations, in
+# output order; the *_context prompts embed the RoBERTa emotion profile
+LLM_RUNNERS = (
+    ('openai_no_roberta', "openai", "v5_all_dimensions", "OpenAI (no RoBERTa)"),
+    ('openai_with_roberta', "openai", "v5_all_dimensions_context", "OpenAI (with RoBERTa)"),
+    ('gemini_no_roberta', "gemini", "v5_all_dimensions", "Gemini (no RoBERTa)"),
+    ('gemini_with_roberta', "gemini", "v5_all_dimensions_context", "Gemini (with RoBERTa)"),
+)
 
 def run_roberta_plain(transcript: str) -> Dict[str, Any]:
     """Run RoBERTa plain (compassion/contempt only)."""
@@ -446,8 +529,110 @@ def run_roberta_valence(transcript: str) -> Dict[str, Any]:
 # MAIN PIPELINE
 # ============================================================================
 
-def run_all_models_on_gold_standard(run_number: int = 1):
-    """Run all 6 models on gold standard videos."""
+def transcript_counts(transcript: str) -> Tuple[int, int]:
+    """
+    (word count, sentence count) where sentences are the non-blank '.'-separated pieces.
+    Sentences are counted without keeping a list of them, and each piece is tested in
+    place (isspace) instead of building a stripped copy.
+    """
+    word_count = len(transcript.split())
+    sentence_count = sum(1 for piece in transcript.split('.') if piece and not piece.isspace())
+    return word_count, sentence_count
+
+def process_video(video_id: str, youtube_id: Optional[str], transcript: str,
+                  llm_futures: List[Tuple[str, Future]]) -> Dict[str, Any]:
+    """
+    Builds one video's results: runs both RoBERTa methods, then collects the already
+    submitted LLM futures (method key, future) in their fixed order.
+    """
+    word_count, sentence_count = transcript_counts(transcript)
+    
+    video_results = {
+        'video_id': video_id,
+        'youtube_id': youtube_id,
+        'transcript_length': len(transcript),
+        'transcript_word_count': word_count,
+        'transcript_sentence_count': sentence_count,
+        'methods': {}
+    }
+    
+    # 5. RoBERTa Plain
+    logging.info(f"  Running RoBERTa Plain: {video_id[:50]}...")
+    roberta_plain = run_roberta_plain(transcript)
+    
+    # 6. RoBERTa Valence
+    logging.info(f"  Running RoBERTa Valence: {video_id[:50]}...")
+    roberta_valence = run_roberta_valence(transcript)
+    
+    # Methods are stored in the fixed order the CSV columns follow
+    for method, future in llm_futures:
+        video_results['methods'][method] = future.result()
+    video_results['methods']['roberta_plain'] = roberta_plain
+    video_results['methods']['roberta_valence'] = roberta_valence
+    return video_results
+
+# orjson writes UTF-8 bytes directly (same output shape as indent=2, ensure_ascii=False)
+_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _json_array_item(item: Any, first: bool) -> bytes:
+    """One element of an indent=2 JSON array, so the file can be written element by element."""
+    # Strings are escaped by orjson, so every raw newline is structural and safe to indent
+    return (b'\n  ' if first else b',\n  ') + orjson.dumps(item, option=_JSON_OPTIONS).replace(b'\n', b'\n  ')
+
+def flatten_video_results(result: Dict[str, Any]) -> Dict[str, Any]:
+    """One flattened CSV row: video metadata plus a {method}_{dimension} column per score."""
+    row = {
+        'video_id': result['video_id'],
+        'youtube_id': result.get('youtube_id'),
+        'transcript_length': result['transcript_length'],
+        'transcript_word_count': result.get('transcript_word_count'),
+        'transcript_sentence_count': result.get('transcript_sentence_count')
+    }
+    
+    # Add scores from each method
+    for method_key, method_result in result['methods'].items():
+        for dim, score in method_result.get('scores', {}).items():
+            col_name = f"{method_key}_{dim}"
+            row[col_name] = score
+    return row
+
+def _submit_llm_block(llm_pool: ThreadPoolExecutor, block: List[Tuple[bytes, str]],
+                      futures_by_digest: Dict[bytes, Dict[str, Future]]) -> None:
+    """
+    Submits the LLM_RUNNERS calls for a block of (digest, transcript) pairs whose digest has
+    none yet. Prompts without RoBERTa context go out immediately. Context prompts get the
+    RoBERTa profile from run_go_emotions inside the call, so the block is scored here in one
+    batch first; the worker threads (and both RoBERTa methods) then only read the analysis
+    cache instead of running the model concurrently.
+    """
+    new = {}
+    for digest, transcript in block:
+        if digest not in futures_by_digest:
+            new.setdefault(digest, transcript)
+    for digest, transcript in new.items():
+        futures_by_digest[digest] = {
+            method: llm_pool.submit(_run_llm, transcript, provider, prompt_version, method, label)
+            for method, provider, prompt_version, label in LLM_RUNNERS
+            if not prompt_version.endswith('_context')
+        }
+    if not new:
+        return
+    try:
+        run_go_emotions_batch(list(new.values()), "roberta_go_emotions")
+    except Exception as e:
+        # Not fatal: each method then scores on its own and records its own error
+        logging.warning(f"  Batched RoBERTa scoring failed: {e}")
+    for digest, transcript in new.items():
+        for method, provider, prompt_version, label in LLM_RUNNERS:
+            if prompt_version.endswith('_context'):
+                futures_by_digest[digest][method] = llm_pool.submit(
+                    _run_llm, transcript, provider, prompt_version, method, label)
+
+def run_all_models_on_gold_standard_scores(run_number: int = 1, max_workers: int = MAX_CONCURRENT_LLM_CALLS):
+    """
+    Run all 6 models on gold standard videos. Returns (flattened score rows, DataFrame of them);
+    the full per-video results are only in the detailed JSON, never returned.
+    """
     logging.info("="*80)
     logging.info(f"RUNNING MODELS ON GOLD STANDARD VIDEOS - RUN #{run_number}")
     logging.info("="*80)
@@ -472,9 +657,10 @@ def run_all_models_on_gold_standard(run_number: int = 1):
     
     # Filter out invalid entries (Excel errors like #NAME?)
     initial_count = len(gold_df)
-    gold_df = gold_df[gold_df['video_id'].astype(str).str.strip() != '#NAME?']
-    gold_df = gold_df[gold_df['video_id'].notna()]
-    gold_df = gold_df[gold_df['video_id'].astype(str).str.len() > 0]
+    # One combined mask: a single string conversion and a single slice
+    video_ids = gold_df['video_id']
+    video_id_str = video_ids.astype(str)
+    gold_df = gold_df[video_ids.notna() & (video_id_str.str.strip() != '#NAME?') & (video_id_str.str.len() > 0)]
     
     filtered_count = initial_count - len(gold_df)
     if filtered_count > 0:
@@ -489,27 +675,39 @@ def run_all_models_on_gold_standard(run_number: int = 1):
     # Skip .docx loading - transcripts are in transcripts/history/ and previous run JSON files
     # docx_transcripts = {}  # Empty dict since we're not using .docx
     docx_transcripts = {}  # Not using .docx anymore - transcripts from JSON files
+    # Normalized keys are computed once here, not on every lookup
+    docx_transcripts, docx_norm = index_docx_transcripts(docx_transcripts)
     logging.info("\nSkipping .docx loading - using transcripts from history/ and previous run JSON files")
     
+    # Both transcript folders are listed once, up front; lookups are then pure dict hits
+    file_index = _transcript_file_index()
+    logging.info(f"Indexed {len(file_index)} transcript IDs in transcripts/{{{','.join(TRANSCRIPT_FOLDERS)}}}")
+    
     if HAS_MLFLOW:
         mlflow.log_param("docx_transcripts_count", 0)
         mlflow.log_param("transcript_source", "history_folder_and_json")
+        mlflow.log_param("indexed_transcript_files", len(file_index))
     
-    # Process each video
-    all_results = []
+    # Process each video: transcripts are gathered first, then videos are processed
+    # while the LLM calls for the whole run are in flight
+    flattened_data = []
     missing_transcripts = []
+    pending = []
     
-    for idx, row in gold_df.iterrows():
-        video_id = row['video_id']
-        youtube_id = row.get('youtube_id')  # May be NaN
-        
+    # Only two columns are read, so iterate them as plain arrays rather than a Series per row;
+    # missing youtube_ids (NaN) become None with one vectorized mask instead of a check per row
+    video_ids = gold_df['video_id'].to_numpy()
+    if 'youtube_id' in gold_df.columns:
+        youtube_ids = gold_df['youtube_id'].astype(object).where(gold_df['youtube_id'].notna(), None).to_numpy()
+    else:
+        youtube_ids = [None] * len(gold_df)
+    for i, (video_id, youtube_id_clean) in enumerate(zip(video_ids, youtube_ids), start=1):
         logging.info(f"\n{'='*80}")
-        logging.info(f"Processing video {idx+1}/{len(gold_df)}: {video_id[:50]}")
+        logging.info(f"Processing video {i}/{len(gold_df)}: {video_id[:50]}")
         logging.info(f"{'='*80}")
         
-        # Get transcript (handle NaN youtube_id)
-        youtube_id_clean = youtube_id if pd.notna(youtube_id) else None
-        transcript = get_transcript_for_video(video_id, youtube_id_clean, docx_transcripts)
+        # Get transcript (youtube_id is already None where it was NaN)
+        transcript = get_transcript_for_video(video_id, youtube_id_clean, docx_transcripts, docx_norm)
         
         if not transcript:
             logging.warning(f"  No transcript available for {video_id}")
@@ -517,86 +715,72 @@ def run_all_models_on_gold_standard(run_number: int = 1):
             continue
         
         logging.info(f"  Transcript length: {len(transcript)} characters")
-        
-        # Run all 6 models
-        transcript_words = transcript.split()
-        transcript_sentences = [s for s in transcript.split('.') if s.strip()]
-        
-        video_results = {
-            'video_id': video_id,
-            'youtube_id': youtube_id if pd.notna(youtube_id) else None,
-            'transcript_length': len(transcript),
-            'transcript_word_count': len(transcript_words),
-            'transcript_sentence_count': len(transcript_sentences),
-            'methods': {}
-        }
-        
-        # 1. OpenAI without RoBERTa
-        logging.info("  Running OpenAI (no RoBERTa)...")
-        video_results['methods']['openai_no_roberta'] = run_openai_without_roberta(transcript)
-        
-        # 2. OpenAI with RoBERTa
-        logging.info("  Running OpenAI (with RoBERTa)...")
-        video_results['methods']['openai_with_roberta'] = run_openai_with_roberta(transcript)
-        
-        # 3. Gemini without RoBERTa
-        logging.info("  Running Gemini (no RoBERTa)...")
-        video_results['methods']['gemini_no_roberta'] = run_gemini_without_roberta(transcript)
-        
-        # 4. Gemini with RoBERTa
-        logging.info("  Running Gemini (with RoBERTa)...")
-        video_results['methods']['gemini_with_roberta'] = run_gemini_with_roberta(transcript)
-        
-        # 5. RoBERTa Plain
-        logging.info("  Running RoBERTa Plain...")
-        video_results['methods']['roberta_plain'] = run_roberta_plain(transcript)
-        
-        # 6. RoBERTa Valence
-        logging.info("  Running RoBERTa Valence...")
-        video_results['methods']['roberta_valence'] = run_roberta_valence(transcript)
-        
-        all_results.append(video_results)
-        
-        # Log summary
-        logging.info("\n  --- Scores Summary (1-5 scale) ---")
-        for method_key, method_result in video_results['methods'].items():
-            if method_result.get('error'):
-                logging.info(f"    {method_key:25s}: ERROR - {method_result['error'][:50]}")
-            else:
-                scores_str = ', '.join([f"{k}={v:.2f}" for k, v in method_result['scores'].items()])
-                logging.info(f"    {method_key:25s}: {scores_str}")
+        pending.append((video_id, youtube_id_clean, transcript))
     
-    # Save results
+    # 1-4. LLM calls are network-bound and independent, so every video's four calls go
+    # through one bounded pool; RoBERTa runs on this thread only, in batches, meanwhile
+    logging.info(f"\nRunning all 6 models on {len(pending)} videos ({max_workers} concurrent LLM calls)...")
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    # 1. Save detailed JSON
+    # 1. Detailed JSON is streamed one video at a time as each completes. A video's futures
+    # (and with them its raw LLM payloads) are dropped once it is written, so only the
+    # submission window's payloads are alive at once; only the flat score rows are kept for
+    # the CSV. The array is written to a .partial file and renamed when complete, so a crash
+    # never leaves a truncated JSON where previous-run readers look for one.
     json_path = os.path.join(run_output_dir, f"model_scores_detailed_{timestamp}.json")
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(all_results, f, indent=2, ensure_ascii=False)
+    partial_json_path = json_path + ".partial"
+    with ThreadPoolExecutor(max_workers=max_workers) as llm_pool, open(partial_json_path, 'wb') as json_file:
+        json_file.write(b'[')
+        # Videos that resolve to the same transcript text (re-uploads, duplicate rows) share
+        # one set of LLM calls, keyed by a digest of the text
+        digests = [hashlib.blake2b(transcript.encode('utf-8'), digest_size=16).digest()
+                   for _, _, transcript in pending]
+        # Videos still to be written per digest; a digest's futures are released after its last
+        uses_left = Counter(digests)
+        if len(uses_left) < len(pending):
+            logging.info(f"  {len(pending) - len(uses_left)} duplicate transcripts reuse earlier LLM results")
+        futures_by_digest = {}
+        
+        # Calls are submitted in a sliding window of videos ahead of the one being consumed,
+        # so the queue stays short (an interrupted run doesn't wait on thousands of calls)
+        window = max(1, max_workers * 2)
+        submitted = 0
+        for i, (video_id, youtube_id, transcript) in enumerate(pending):
+            while submitted < len(pending) and submitted - i < window:
+                block_end = min(len(pending), submitted + ROBERTA_BATCH_VIDEOS)
+                _submit_llm_block(llm_pool, [(digests[j], pending[j][2]) for j in range(submitted, block_end)],
+                                  futures_by_digest)
+                submitted = block_end
+            digest = digests[i]
+            futures = [(method, futures_by_digest[digest][method]) for method, *_ in LLM_RUNNERS]
+            video_results = process_video(video_id, youtube_id, transcript, futures)
+            json_file.write(_json_array_item(video_results, first=(i == 0)))
+            json_file.flush()
+            uses_left[digest] -= 1
+            if not uses_left[digest]:
+                del futures_by_digest[digest]
+            flattened_data.append(flatten_video_results(video_results))
+            
+            # Log summary
+            logging.info(f"\n  --- Scores Summary (1-5 scale): {video_id[:50]} ---")
+            for method_key, method_result in video_results['methods'].items():
+                if method_result.get('error'):
+                    logging.info(f"    {method_key:25s}: ERROR - {method_result['error'][:50]}")
+                else:
+                    scores_str = ', '.join([f"{k}={v:.2f}" for k, v in method_result['scores'].items()])
+                    logging.info(f"    {method_key:25s}: {scores_str}")
+        json_file.write(b'\n]' if flattened_data else b']')
+    os.replace(partial_json_path, json_path)
+    
+    _save_transcript_cache(TRANSCRIPT_CACHE)
+    
+    # Save results
     logging.info(f"\n✓ Detailed results saved to: {json_path}")
     
     if HAS_MLFLOW:
         mlflow.log_artifact(json_path, "detailed_results")
     
     # 2. Create flattened CSV for easy comparison
-    flattened_data = []
-    for result in all_results:
-        row = {
-            'video_id': result['video_id'],
-            'youtube_id': result.get('youtube_id'),
-            'transcript_length': result['transcript_length'],
-            'transcript_word_count': result.get('transcript_word_count'),
-            'transcript_sentence_count': result.get('transcript_sentence_count')
-        }
-        
-        # Add scores from each method
-        for method_key, method_result in result['methods'].items():
-            for dim, score in method_result.get('scores', {}).items():
-                col_name = f"{method_key}_{dim}"
-                row[col_name] = score
-        
-        flattened_data.append(row)
-    
     df_scores = pd.DataFrame(flattened_data)
     csv_path = os.path.join(run_output_dir, f"model_scores_{timestamp}.csv")
     df_scores.to_csv(csv_path, index=False)
@@ -614,7 +798,7 @@ def run_all_models_on_gold_standard(run_number: int = 1):
     
     # 4. Log summary metrics to MLflow
     if HAS_MLFLOW:
-        mlflow.log_metric("videos_processed", len(all_results))
+        mlflow.log_metric("videos_processed", len(flattened_data))
         mlflow.log_metric("videos_missing_transcripts", len(missing_transcripts))
         mlflow.log_metric("avg_transcript_length", df_scores['transcript_length'].mean() if len(df_scores) > 0 else 0)
         mlflow.log_metric("avg_word_count", df_scores['transcript_word_count'].mean() if len(df_scores) > 0 else 0)
@@ -627,14 +811,14 @@ def run_all_models_on_gold_standard(run_number: int = 1):
                 success_count = df_scores[method_cols[0]].notna().sum()
                 mlflow.log_metric(f"{method}_success_rate", success_count / len(df_scores))
     
-    logging.info(f"\n✅ Completed! Processed {len(all_results)} videos")
+    logging.info(f"\n✅ Completed! Processed {len(flattened_data)} videos")
     logging.info(f"   Results saved to: {run_output_dir}/")
     
     if HAS_MLFLOW:
         mlflow.end_run()
         logging.info(f"   MLflow run logged: {run_name}")
     
-    return all_results, df_scores
+    return flattened_data, df_scores
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Run models on gold standard videos')
@@ -642,11 +826,13 @@ if __name__ == "__main__":
                        help='Run number (1 for first run, 2 for second run, etc.)')
     parser.add_argument('--compassion-only', action='store_true',
                        help='Only analyze compassion_contempt dimension (still calls all 5 for consistency)')
+    parser.add_argument('--max-workers', type=int, default=MAX_CONCURRENT_LLM_CALLS,
+                       help=f'Concurrent LLM calls (default: {MAX_CONCURRENT_LLM_CALLS})')
     
     args = parser.parse_args()
     
     try:
-        results, scores_df = run_all_models_on_gold_standard(run_number=args.run_number)
+        results, scores_df = run_all_models_on_gold_standard_scores(run_number=args.run_number, max_workers=args.max_workers)
         print(f"\n{'='*80}")
         print(f"SUCCESS! Processed {len(results)} videos (Run #{args.run_number})")
         print(f"{'='*80}")
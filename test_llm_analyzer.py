@@ -10,7 +10,7 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 MLFLOW_EXPERIMENT_NAME = "Peace Speech Dimension Analysis"
 EVAL_SET_FILE = "eval_set.json"
 MODELS_TO_TEST = ["openai", "gemini"]
-PROMPT_VERSIONS_TO_TEST = ["v1", "v2"] # We will now test both versions
+PROMPT_VERSIONS_TO_TEST = ["v1", "v2_streamlined"] # We will now test both versions
 
 # --- Helper Functions ---
 
@@ -93,7 +93,7 @@ if __name__ == "__main__":
                     try:
                         analysis = llm_analyzer.analyze_transcript_with_llm(
                             transcript=test_case["transcript"],
-                            model_name=model_name,
+                            model_provider=model_name,
                             prompt_version=prompt_version
                         )
                         
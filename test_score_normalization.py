@@ -0,0 +1,53 @@
+"""
+Equivalence check: the vectorized normalize_llm_scores_to_1_5 must return exactly what the
+scalar normalize_llm_score_to_1_5 returns for every input (value and type).
+
+Run with: python -m pytest test_score_normalization.py
+"""
+
+import random
+
+import numpy as np
+
+from run_models_on_gold_standard import _SCORE_RANGES, normalize_llm_score_to_1_5, normalize_llm_scores_to_1_5
+
+SPECIAL_INPUTS = [
+    None, float('nan'), np.nan, float('inf'), float('-inf'),
+    "3", "4.5", "-2", "abc", "", "nan", True, False, {}, [],
+    np.float64(2.5), np.int64(4),
+]
+
+def _boundary_inputs():
+    """Each range's ends, plus values just inside and outside them."""
+    inputs = []
+    for low, high, *_ in _SCORE_RANGES:
+        for edge in (low, high):
+            inputs += [edge, float(edge), edge - 1e-4, edge + 1e-4, edge - 1e-9, edge + 1e-9]
+    return inputs
+
+def _sampled_inputs(n: int = 20000):
+    rng = random.Random(1234)
+    floats = [rng.uniform(-10, 110) for _ in range(n)]
+    # LLMs mostly answer with integers and short decimals
+    ints = [rng.randint(-10, 110) for _ in range(n)]
+    decimals = [round(rng.uniform(-6, 6), rng.randint(1, 3)) for _ in range(n)]
+    return floats + ints + decimals + [str(x) for x in decimals[:1000]]
+
+def _assert_equivalent(inputs):
+    vectorized = normalize_llm_scores_to_1_5(inputs)
+    assert len(vectorized) == len(inputs)
+    for score, got in zip(inputs, vectorized):
+        expected = normalize_llm_score_to_1_5(score, "any")
+        assert got == expected and type(got) is type(expected), (score, expected, got)
+
+def test_special_inputs():
+    _assert_equivalent(SPECIAL_INPUTS)
+
+def test_range_boundaries():
+    _assert_equivalent(_boundary_inputs())
+
+def test_sampled_inputs():
+    _assert_equivalent(_sampled_inputs())
+
+def test_empty():
+    assert normalize_llm_scores_to_1_5([]) == []